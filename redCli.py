@@ -1,5 +1,7 @@
 import curses
 import praw
+import prawcore
+import requests
 import getpass
 import textwrap
 import time
@@ -10,18 +12,86 @@ import queue     # Still here for future potential
 import os
 import configparser # For reading config file
 import sys # For exit
+import select
+import signal
+import argparse
+import functools
+import json
+import re
+import unicodedata
+import hashlib
+import mmap
+import struct
+import random
+import bisect
+import gzip
+from concurrent.futures import Future
+from collections import deque, namedtuple
+from contextlib import contextmanager, redirect_stdout
+from types import SimpleNamespace
 
 # --- Default Configuration (Used if config file is missing/incomplete) ---
 DEFAULT_TARGET_SUBREDDITS = ["commandline", "linux", "python", "devops", "selfhosted"]
 DEFAULT_POST_LIMIT = 30
 DEFAULT_COMMENT_LIMIT = 50
 DEFAULT_USER_AGENT = "CursesRedditClient/0.3 by Anonymous User (Please set in config.ini)"
+DEFAULT_LISTING_MODE = "new"
 
 # --- Constants ---
 CONFIG_FILE = "config.ini"
 LEFT_PANE_WIDTH_RATIO = 0.30
 MIN_LEFT_PANE_WIDTH = 20
 STATUS_BAR_HEIGHT = 1
+PERF_OVERLAY_REFRESH = 1.0 # Seconds between overlay repaints while idle
+
+# Keys collapsed into one state change when several are pending at once
+COALESCED_KEYS = {curses.KEY_DOWN, curses.KEY_UP, ord('j'), ord('k')}
+# Keys that can open a prompt; what was typed after them belongs to the prompt, not the view
+PROMPT_KEYS = {ord('/'), ord('R'), ord('C')}
+
+# Listing modes; "top" takes a time window, e.g. "top:week"
+LISTING_MODES = ("new", "hot", "rising", "top")
+TOP_TIME_FILTERS = ("hour", "day", "week", "month", "year", "all")
+LISTING_TTL = {"new": 60, "hot": 300, "rising": 120, "top": 900} # Seconds before a cached listing is refreshed
+LISTING_RETRY_MIN = 15  # Seconds before retrying a failed background refresh, doubled per failure
+LISTING_RETRY_MAX = 900
+
+# Comment sorting, applied locally to the loaded tree
+COMMENT_SORTS = ('best', 'top', 'new', 'controversial', 'old')
+COMMENT_BLOCK_CACHE_MAX = 50000 # Laid out comments kept across re-sorts and refetches
+REVISIT_COMMENT_LIMIT = 200 # Newest comments fetched when re-opening a thread that is already loaded
+THREAD_DOWNLOAD_WORKERS = 4 # Concurrent morechildren requests when loading an entire thread
+THREAD_DOWNLOAD_PUBLISH = 0.5 # Seconds between partial trees shown while a thread downloads
+LIVE_POLL_MIN = 5    # Seconds between live polls of a busy thread
+LIVE_POLL_MAX = 120  # ...and of a quiet one
+
+# Markdown
+MARKDOWN_BACKGROUND_MIN = 200 # Threads with more comments are parsed off the UI thread
+MARKDOWN_CACHE_MAX = 50000 # Parsed bodies kept, like COMMENT_BLOCK_CACHE_MAX
+
+# Display width
+WIDTH_CACHE_SIZE = 8192 # Memoized widths of non-ASCII strings
+
+# Performance instrumentation
+PERF_WINDOW = 240 # Samples kept per timer for rolling percentiles
+PERF_OVERLAY_WIDTH = 52
+NET_LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0) # Seconds, upper bounds of histogram buckets
+TRACE_MAX_EVENTS = 200000 # Bound memory use of --trace on long sessions
+
+# Headless dump mode
+DEFAULT_DUMP_WORKERS = 4
+DUMP_QUEUE_SIZE = 256 # Records buffered between fetch workers and stdout
+
+# Outbound write actions (votes, saves, replies)
+OUTBOX_FILE = "outbox.json"
+ACTION_RETRY_BASE = 2     # Seconds, doubled on every consecutive failure
+ACTION_RETRY_MAX = 120    # Backoff cap while offline
+ACTION_MAX_ATTEMPTS = 5   # Server errors before an action is given up and rolled back
+
+# Seen posts, a Bloom filter mapped from disk
+SEEN_FILE = "seen.bloom"
+SEEN_BLOOM_BITS = 1 << 25 # 4 MiB file; about 0.5% false positives after three million posts
+SEEN_BLOOM_HASHES = 7
 
 # Views
 VIEW_LIST = 0
@@ -72,35 +142,1106 @@ def safe_addstr(window, y, x, text, attr=0):
         if y >= h or x >= w or y < 0 or x < 0: return
         available_width = w - x
         if available_width <= 0: return
-        truncated_text = text.replace('\n', ' ').replace('\r', '')[:available_width]
+        truncated_text = truncate_to_width(text.replace('\n', ' ').replace('\r', ''), available_width)
         window.addstr(y, x, truncated_text, attr)
     except curses.error:
         pass
     except Exception:
         pass
 
+def format_duration(seconds):
+    """Short human readable duration for the perf overlay."""
+    if seconds is None: return "-"
+    if seconds < 0.001: return f"{seconds * 1e6:.0f}us"
+    if seconds < 1: return f"{seconds * 1e3:.1f}ms"
+    return f"{seconds:.2f}s"
+
+def coalesce_keys(keys):
+    """Groups pending keys into (key, count) pairs, merging runs of navigation keys."""
+    grouped = []
+    for key in keys:
+        if grouped and key == grouped[-1][0] and key in COALESCED_KEYS:
+            grouped[-1][1] += 1
+        else:
+            grouped.append([key, 1])
+    return [tuple(pair) for pair in grouped]
+
+# --- Display Width ---
+# Terminal columns taken by text: 2 for East Asian wide/fullwidth characters
+# (CJK, most emoji), 0 for combining marks and format characters, 1 otherwise.
+# ASCII text takes the len() fast path everywhere.
+_bmp_widths = None # bytes, width of every BMP code point, built on first use
+_astral_widths = {}
+
+def _code_point_width(ch):
+    if unicodedata.east_asian_width(ch) in ('W', 'F'): return 2
+    if unicodedata.combining(ch) or unicodedata.category(ch) in ('Mn', 'Me', 'Cf', 'Cc'): return 0
+    return 1
+
+def _width_table():
+    global _bmp_widths
+    if _bmp_widths is None:
+        _bmp_widths = bytes(_code_point_width(chr(cp)) for cp in range(0x10000))
+    return _bmp_widths
+
+def char_width(ch):
+    cp = ord(ch)
+    if cp < 0x10000: return _width_table()[cp]
+    width = _astral_widths.get(cp)
+    if width is None: width = _astral_widths[cp] = _code_point_width(ch)
+    return width
+
+@functools.lru_cache(maxsize=WIDTH_CACHE_SIZE)
+def _non_ascii_width(text):
+    table = _width_table()
+    return sum(table[ord(ch)] if ord(ch) < 0x10000 else char_width(ch) for ch in text)
+
+def str_width(text):
+    """Number of terminal columns `text` occupies."""
+    if text.isascii(): return len(text)
+    return _non_ascii_width(text)
+
+def truncate_to_width(text, width):
+    """Longest prefix of `text` that fits in `width` columns."""
+    if text.isascii(): return text[:width]
+    if _non_ascii_width(text) <= width: return text
+    used = 0
+    for i, ch in enumerate(text):
+        used += char_width(ch)
+        if used > width: return text[:i]
+    return text
+
+def wrap_spans(spans, width, initial_indent="", subsequent_indent="", indent_style="text"):
+    """Greedy column-aware wrap of styled (text, style) spans into lines of spans.
+
+    Whitespace stays at the end of the line it follows, so joining the lines
+    gives back the original text. Words wider than a line, e.g. unspaced CJK
+    runs, are split at character boundaries.
+    """
+    lines = []
+    line = [(initial_indent, indent_style)] if initial_indent else []
+    line_w = str_width(initial_indent)
+    has_text = False
+    indent_w = str_width(subsequent_indent)
+
+    def append(text, style):
+        if line and line[-1][1] == style: line[-1] = (line[-1][0] + text, style)
+        else: line.append((text, style))
+
+    for text, style in spans:
+        for chunk in re.split(r'(\s+)', text):
+            if not chunk: continue
+            chunk_w = str_width(chunk)
+            if chunk.isspace() or line_w + chunk_w <= width:
+                append(chunk, style); line_w += chunk_w; has_text = True
+                continue
+            if has_text and chunk_w <= width - indent_w:
+                lines.append(line)
+                line = [(subsequent_indent, indent_style)] if subsequent_indent else []
+                append(chunk, style); line_w = indent_w + chunk_w
+                continue
+            for ch in chunk: # Over-long word, break it wherever the line is full
+                ch_w = char_width(ch)
+                if line_w + ch_w > width and has_text:
+                    lines.append(line)
+                    line = [(subsequent_indent, indent_style)] if subsequent_indent else []
+                    line_w = indent_w
+                append(ch, style); line_w += ch_w; has_text = True
+    if has_text: lines.append(line)
+    return lines
+
+def wrap_text(text, width, initial_indent="", subsequent_indent=""):
+    """textwrap.wrap(replace_whitespace=False, drop_whitespace=False) measured in columns."""
+    if text.isascii() and initial_indent.isascii() and subsequent_indent.isascii():
+        lines = textwrap.wrap(text, width=width, replace_whitespace=False, drop_whitespace=False,
+                              initial_indent=initial_indent, subsequent_indent=subsequent_indent)
+        # textwrap starts the next line with the whitespace it broke at; leave it at the end of the line before, as wrap_spans does
+        cut = len(subsequent_indent)
+        for i in range(1, len(lines)):
+            body = lines[i][cut:].lstrip()
+            if len(body) < len(lines[i]) - cut and body:
+                lines[i - 1] += lines[i][cut:len(lines[i]) - len(body)]
+                lines[i] = subsequent_indent + body
+        return lines
+    return [''.join(part for part, _ in line) for line in wrap_spans([(text, "text")], width, initial_indent, subsequent_indent)]
+
+def _fold(text):
+    """Lowercases `text` without changing its length, so offsets still index the original."""
+    lowered = text.lower()
+    if len(lowered) == len(text): return lowered
+    return ''.join(ch.lower() if len(ch.lower()) == 1 else ch for ch in text)
+
+class LineFinder:
+    """Case-insensitive find over wrapped lines, built once per layout.
+
+    The lines are joined back into one lowercased buffer (wrapping leaves
+    whitespace at the end of the line it follows), so matches can cross a
+    wrap. Lines flagged as starting a paragraph (a Markdown block, a comment's
+    meta line), and lines after a blank one, are separated by a space, as the
+    break reads. Positions are offsets into the buffer.
+
+    While a query is typed only str.find runs, which stops at the first match,
+    and a scan of the visible lines; counting and n/N use the match offsets,
+    found once per query and then bisected.
+    """
+    def __init__(self, lines):
+        """`lines` yields (text, starts_paragraph) pairs."""
+        parts, pos, previous = [], 0, ""
+        self.starts, self.lengths, self.indents = [], [], []
+        for text, starts_paragraph in lines:
+            body = text.lstrip() # Drop the indent, it isn't part of the text
+            if parts and (starts_paragraph or not previous):
+                parts.append(" "); pos += 1
+            self.starts.append(pos)
+            self.lengths.append(len(body))
+            self.indents.append(len(text) - len(body))
+            parts.append(_fold(body)); pos += len(body)
+            previous = body
+        self.text = "".join(parts)
+        self._matches = (None, []) # (folded query, sorted start offsets)
+
+    def line_of(self, pos):
+        return bisect.bisect_right(self.starts, pos) - 1
+
+    def matches(self, query):
+        """Start offsets of every match (overlapping ones too), computed once per query."""
+        query = _fold(query)
+        if self._matches[0] != query:
+            offsets = [m.start() for m in re.finditer(f"(?={re.escape(query)})", self.text)] if query else []
+            self._matches = (query, offsets)
+        return self._matches[1]
+
+    def ordinal(self, query, pos):
+        """(1-based number of the match at `pos`, number of matches)."""
+        offsets = self.matches(query)
+        return bisect.bisect_left(offsets, pos) + 1, len(offsets)
+
+    def next(self, query, pos, step=1):
+        """Position of the first match at or after `pos` (step 1) or before it (step -1), wrapping around."""
+        query = _fold(query)
+        if not query: return None
+        if self._matches[0] == query:
+            offsets = self._matches[1]
+            if not offsets: return None
+            index = bisect.bisect_left(offsets, pos) - (step < 0)
+            return offsets[index % len(offsets)]
+        if step > 0: found = self.text.find(query, pos)
+        else: found = self.text.rfind(query, 0, max(0, pos + len(query) - 1))
+        if found == -1: # Wrap around, scanning only the part not searched yet
+            if step > 0: found = self.text.find(query, 0, pos + len(query) - 1)
+            else: found = self.text.rfind(query, pos)
+        return None if found == -1 else found
+
+    def ranges(self, query, first, last):
+        """{line: [(start, end) columns]} of the matches on lines first..last-1, split at wraps."""
+        query = _fold(query)
+        found = {}
+        if not query or first >= len(self.starts): return found
+        end = self.starts[last] if last < len(self.starts) else len(self.text)
+        scan_end = end + len(query) - 1 # Only matches starting before `end`
+        pos = self.text.find(query, max(0, self.starts[first] - len(query) + 1), scan_end)
+        while pos != -1:
+            stop = pos + len(query)
+            line = self.line_of(pos)
+            while line < min(last, len(self.starts)) and self.starts[line] < stop:
+                start = max(pos, self.starts[line]) - self.starts[line]
+                length = min(stop, self.starts[line] + self.lengths[line]) - self.starts[line]
+                if line >= first and start < length:
+                    indent = self.indents[line]
+                    found.setdefault(line, []).append((start + indent, length + indent))
+                line += 1
+            pos = self.text.find(query, pos + 1, scan_end)
+        return found
+
+# --- Comment Trees ---
+_COMMENT_SORT_KEYS = {
+    'top': lambda c: -c.score,
+    'new': lambda c: -c.created_utc,
+    'old': lambda c: c.created_utc,
+    # Only the 0/1 flag is exposed; among flagged ones, scores nearest zero first
+    'controversial': lambda c: (-getattr(c, 'controversiality', 0), abs(c.score)),
+}
+
+def sort_comments(comments, mode, pinned=()):
+    """Threads a flat comment list (any order) depth-first with siblings ordered by `mode`.
+
+    'best' keeps the fetched (server) order of siblings. "Load more" items stay
+    last among their siblings; pending and just-posted replies (ids in `pinned`)
+    come first. Items whose parent is neither the post nor a loaded comment are
+    dropped along with their subtree.
+    """
+    children = {}
+    known = set()
+    for comment in comments:
+        children.setdefault(comment.parent_id, []).append(comment)
+        if comment.id and not isinstance(comment, praw.models.MoreComments): known.add(f"t1_{comment.id}")
+    sort_key = _COMMENT_SORT_KEYS.get(mode)
+
+    def ordered(siblings):
+        return sorted(siblings, key=lambda c: _sibling_key(c, sort_key, pinned))
+
+    roots = []
+    for parent_id, siblings in children.items():
+        if parent_id not in known and parent_id.startswith('t3_'): roots.extend(siblings)
+    result = []
+    stack = list(reversed(ordered(roots)))
+    while stack:
+        comment = stack.pop()
+        result.append(comment)
+        if isinstance(comment, praw.models.MoreComments) or not comment.id: continue
+        stack.extend(reversed(ordered(children.get(f"t1_{comment.id}", ()))))
+    return result
+
+def _sibling_key(comment, sort_key, pinned):
+    if isinstance(comment, praw.models.MoreComments): return (2, 0)
+    if isinstance(comment, PendingReply) or comment.id in pinned: return (0, 0)
+    return (1, sort_key(comment) if sort_key else 0)
+
+def insert_sorted_comment(ordered, comment, mode, pinned=()):
+    """Inserts a new comment into a sort_comments result where re-sorting everything would put it.
+
+    Returns its index, or None if its parent isn't in `ordered` (sort_comments
+    would drop it). Subtrees are found by depth, which Reddit sends with every comment.
+    """
+    if comment.parent_id.startswith('t3_'):
+        index, depth = 0, 0
+    else:
+        parent_id = comment.parent_id[3:]
+        parent = next((i for i, c in enumerate(ordered) if c.id == parent_id and not isinstance(c, praw.models.MoreComments)), None)
+        if parent is None: return None
+        index, depth = parent + 1, ordered[parent].depth + 1
+    sort_key = _COMMENT_SORT_KEYS.get(mode)
+    key = _sibling_key(comment, sort_key, pinned)
+    # Skip siblings (and their subtrees) that sort before or equal to it; the new one came last
+    while index < len(ordered) and ordered[index].depth >= depth:
+        if ordered[index].depth == depth and key < _sibling_key(ordered[index], sort_key, pinned): break
+        index += 1
+    ordered.insert(index, comment)
+    return index
+
+def fetch_newest_comments(reddit, post_id, limit=REVISIT_COMMENT_LIMIT):
+    """(newest `limit` comments of a thread breadth first, parents before replies; the MoreComments left unexpanded)."""
+    submission = reddit.submission(id=post_id)
+    submission.comment_sort = "new"
+    submission.comment_limit = limit
+    skipped = submission.comments.replace_more(limit=0)
+    return submission.comments.list(), skipped
+
+# --- Markdown ---
+# Bodies are parsed once into blocks of styled spans (see parse_markdown) and
+# laid out per width by layout_markdown. Styles map to curses attributes in
+# setup_curses; "text" means the caller's base attribute.
+MarkdownDoc = namedtuple('MarkdownDoc', 'blocks links')
+# Block: (first_prefix, rest_prefix, prefix_style, spans, mode), mode is 'wrap', 'clip' or 'rule'
+
+_MD_INLINE = re.compile(
+    r"`(?P<code>[^`]+)`"
+    r"|\*\*(?P<bold>.+?)\*\*|__(?P<bold_>.+?)__"
+    r"|~~(?P<strike>.+?)~~"
+    r"|(?<![\w*\\])\*(?P<italic>[^*\s](?:[^*]*[^*\s])?)\*(?!\w)"
+    r"|(?<![\w\\])_(?P<italic_>[^_\s](?:[^_]*[^_\s])?)_(?!\w)"
+    # URLs may hold one level of balanced parentheses, e.g. Wikipedia's Foo_(bar)
+    r"|\[(?P<label>[^\]]+)\]\((?P<url>(?:[^()\s]|\([^()\s]*\))+)(?:\s+\"[^\"]*\")?\)"
+    r"|(?P<bare>https?://(?:[^\s()\]>]|\([^\s()]*\))*(?:[^\s()\]>.,;:!?'\"]|\([^\s()]*\)))"
+)
+_MD_ESCAPE = re.compile(r"\\([\\`*_{}\[\]()#+\-.!>~^|])")
+_MD_RULE = re.compile(r"^(?:(?:\*\s*){3,}|(?:-\s*){3,}|(?:_\s*){3,})$")
+_MD_HEADING = re.compile(r"^#{1,6}\s+(.*?)\s*#*$")
+_MD_QUOTE = re.compile(r"^((?:>\s?)+)(.*)$")
+_MD_LIST = re.compile(r"^(\s*)([-*+]|\d+[.)])\s+(.*)$")
+
+def _parse_inline(text, base_style, links):
+    spans = []
+    pos = 0
+    def plain(segment, style):
+        if segment: spans.append((_MD_ESCAPE.sub(r"\1", segment), style))
+    for m in _MD_INLINE.finditer(text):
+        plain(text[pos:m.start()], base_style)
+        kind = m.lastgroup
+        if kind == 'url':
+            links.append((m.group('label'), m.group('url')))
+            plain(m.group('label'), 'link')
+        elif kind == 'bare':
+            links.append((m.group('bare'), m.group('bare')))
+            spans.append((m.group('bare'), 'link'))
+        elif kind == 'code':
+            spans.append((m.group('code'), 'code'))
+        else:
+            plain(m.group(kind), kind.rstrip('_'))
+        pos = m.end()
+    plain(text[pos:], base_style)
+    return spans
+
+def parse_markdown(text):
+    """Converts a Reddit Markdown body into a MarkdownDoc. Blank lines are dropped, like the plain renderer did."""
+    blocks, links = [], []
+    in_fence = False
+    for line in (text or "").split('\n'):
+        line = line.rstrip('\r')
+        if line.lstrip().startswith('```'):
+            in_fence = not in_fence
+            continue
+        if in_fence or (line.startswith('    ') and line.strip() and not _MD_LIST.match(line)):
+            blocks.append(("  ", "  ", "code", [(line if in_fence else line[4:], "code")], 'clip'))
+            continue
+        stripped = line.strip()
+        if not stripped: continue
+        if _MD_RULE.match(stripped):
+            blocks.append(("", "", "quote", [], 'rule'))
+            continue
+        heading = _MD_HEADING.match(stripped)
+        if heading:
+            blocks.append(("", "", "heading", _parse_inline(heading.group(1), "heading", links), 'wrap'))
+            continue
+        quote = _MD_QUOTE.match(stripped)
+        if quote:
+            bar = "│ " * quote.group(1).count('>')
+            blocks.append((bar, bar, "quote", _parse_inline(quote.group(2), "quote", links), 'wrap'))
+            continue
+        item = _MD_LIST.match(line)
+        if item:
+            nesting = "  " * (len(item.group(1)) // 2)
+            bullet = "• " if item.group(2) in "-*+" else f"{item.group(2)} "
+            blocks.append((nesting + bullet, nesting + " " * str_width(bullet), "text", _parse_inline(item.group(3), "text", links), 'wrap'))
+            continue
+        blocks.append(("", "", "text", _parse_inline(stripped, "text", links), 'wrap'))
+    return MarkdownDoc(blocks, links)
+
+def layout_markdown(doc, width, indent=""):
+    """Wraps a MarkdownDoc to `width` columns; returns (spans, starts a block) per line."""
+    lines = []
+    for first, rest, prefix_style, spans, mode in doc.blocks:
+        if mode == 'rule':
+            lines.append(([(indent, "text"), ("─" * max(0, width - str_width(indent)), prefix_style)], True))
+        elif mode == 'clip':
+            lines.append(([(indent + first, prefix_style)] + spans, True)) # Code keeps its layout, cut at the pane edge
+        else:
+            lines.extend((line, i == 0) for i, line in enumerate(wrap_spans(spans, width, indent + first, indent + rest, prefix_style)))
+    return lines
+
+def benchmark_display_width(iterations=2000):
+    """Times the width-aware helpers against the len()-based originals on ASCII text."""
+    sample = ("The quick brown fox jumps over the lazy dog while the build server "
+              "recompiles the kernel for the third time today. ") * 4
+    titles = [f"{i:>4}: {sample[i % 50:i % 50 + 80]}" for i in range(200)]
+    cases = [
+        ("truncate", lambda t: t[:60], lambda t: truncate_to_width(t, 60)),
+        ("width", len, str_width),
+        ("wrap", lambda t: textwrap.wrap(t, width=50, replace_whitespace=False, drop_whitespace=False),
+                 lambda t: wrap_text(t, 50)),
+    ]
+    results = []
+    for name, baseline, candidate in cases:
+        timings = []
+        for func in (baseline, candidate):
+            start = time.perf_counter()
+            for _ in range(iterations // 100 if name == "wrap" else iterations):
+                for title in titles: func(title)
+            timings.append(time.perf_counter() - start)
+        results.append((name, timings[0], timings[1]))
+    return results
+
 def draw_loading_pane(window, message="Loading..."):
     """Clears window and displays a centered loading message."""
     h, w = window.getmaxyx()
     window.erase()
     window.border() # Keep the border
-    safe_addstr(window, h // 2, (w - len(message)) // 2, message, curses.A_BOLD | curses.color_pair(3)) # Yellow Bold
+    safe_addstr(window, h // 2, (w - str_width(message)) // 2, message, curses.A_BOLD | curses.color_pair(3)) # Yellow Bold
     try:
         window.refresh()
     except curses.error: pass
 
 
+# --- Performance Instrumentation ---
+class PerfMonitor:
+    """Rolling timings, cache counters and (optionally) a Chrome trace of the hot paths."""
+    def __init__(self, trace_file=None, window=PERF_WINDOW):
+        self.window = window
+        self.samples = {}  # name -> deque of durations in seconds
+        self.counters = {} # name -> [hits, misses]
+        self.net_histogram = [0] * (len(NET_LATENCY_BUCKETS) + 1)
+        self.trace_file = trace_file
+        self.trace_events = deque(maxlen=TRACE_MAX_EVENTS) if trace_file else None
+        self.pending_key_time = None # Time of the oldest key not yet painted
+        self._waited = threading.local() # .total: seconds this thread spent in waiting()
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock() # Background threads record too
+
+    @contextmanager
+    def span(self, name, category="app"):
+        start, waited = time.perf_counter(), getattr(self._waited, 'total', 0.0)
+        try:
+            yield
+        finally:
+            waited = getattr(self._waited, 'total', 0.0) - waited
+            self.record(name, start + waited, time.perf_counter(), category)
+
+    @contextmanager
+    def waiting(self):
+        """Marks time spent blocked on the user (e.g. typing into a prompt); the enclosing spans and key_to_paint leave it out."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            waited = time.perf_counter() - start
+            self._waited.total = getattr(self._waited, 'total', 0.0) + waited
+            if self.pending_key_time is not None: self.pending_key_time += waited
+
+    def record(self, name, start, end, category="app"):
+        duration = end - start
+        with self._lock:
+            samples = self.samples.get(name)
+            if samples is None:
+                samples = self.samples[name] = deque(maxlen=self.window)
+            samples.append(duration)
+            if category == "net":
+                bucket = len(NET_LATENCY_BUCKETS)
+                for i, bound in enumerate(NET_LATENCY_BUCKETS):
+                    if duration < bound: bucket = i; break
+                self.net_histogram[bucket] += 1
+            if self.trace_events is not None:
+                self.trace_events.append({
+                    "name": name, "cat": category, "ph": "X",
+                    "ts": (start - self._t0) * 1e6, "dur": duration * 1e6,
+                    "pid": os.getpid(), "tid": threading.get_ident(),
+                })
+
+    def count(self, name, hit):
+        """Records a cache lookup result for hit-rate reporting."""
+        with self._lock:
+            counter = self.counters.setdefault(name, [0, 0])
+            counter[0 if hit else 1] += 1
+
+    def key_pressed(self):
+        if self.pending_key_time is None:
+            self.pending_key_time = time.perf_counter()
+
+    def frame_painted(self):
+        if self.pending_key_time is not None:
+            self.record("key_to_paint", self.pending_key_time, time.perf_counter())
+            self.pending_key_time = None
+
+    def percentiles(self, name, points=(50, 95, 99)):
+        """Returns the requested percentiles of a timer, or None if it has no samples."""
+        with self._lock:
+            samples = sorted(self.samples.get(name, ()))
+        if not samples: return None
+        return tuple(samples[min(len(samples) - 1, int(len(samples) * p / 100))] for p in points)
+
+    def hit_rate(self, name):
+        hits, misses = self.counters.get(name, (0, 0))
+        total = hits + misses
+        return (hits / total if total else None), total
+
+    def rss_bytes(self):
+        """Current resident set size (peak RSS where /proc is unavailable)."""
+        try:
+            with open('/proc/self/statm') as f:
+                return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, ValueError, IndexError, AttributeError):
+            pass
+        try:
+            import resource
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return peak if sys.platform == 'darwin' else peak * 1024
+        except (ImportError, OSError):
+            return None
+
+    def write_trace(self):
+        """Dumps collected events in Chrome trace-event format (chrome://tracing, Perfetto)."""
+        if not self.trace_file: return
+        with self._lock:
+            events = list(self.trace_events)
+        try:
+            with open(self.trace_file, 'w') as f:
+                json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        except IOError as e:
+            print(f"ERROR: Could not write trace file: {e}")
+
+def timed(name, category="app"):
+    """Method decorator recording each call under `name` in self.perf."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            with self.perf.span(name, category):
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# --- Write Actions ---
+def vote_arrow(thing):
+    likes = getattr(thing, 'likes', None)
+    if likes is True: return "▲"
+    if likes is False: return "▼"
+    return " "
+
+class PendingReply:
+    """Stand-in for a reply that is queued but not posted yet, drawn like a comment."""
+    def __init__(self, parent_fullname, depth, body, author_name):
+        self.id = None
+        self.parent_id = parent_fullname
+        self.depth = depth
+        self.body = body
+        self.author = SimpleNamespace(name=author_name) if author_name else None
+        self.score = 1
+        self.likes = True
+        self.saved = False
+        self.created_utc = time.time()
+
+class WorkerPool:
+    """Long-lived daemon threads running submitted calls in order.
+
+    Background fetches go through these instead of a new thread each, so every
+    worker builds its PRAW instance (and fetches its OAuth token) once per session.
+    Unlike ThreadPoolExecutor's, the threads don't hold up exit.
+    """
+    def __init__(self, workers, name):
+        self._queue = queue.Queue()
+        for i in range(workers):
+            threading.Thread(target=self._run, name=f"{name}-{i}", daemon=True).start()
+
+    def submit(self, fn, *args):
+        future = Future()
+        self._queue.put((future, fn, args))
+        return future
+
+    def _run(self):
+        while True:
+            future, fn, args = self._queue.get()
+            if not future.set_running_or_notify_cancel(): continue # Cancelled while queued
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+class ActionQueue:
+    """Persistent outbound queue of write actions, submitted in order by a background thread.
+
+    Actions are plain dicts so they can be saved to OUTBOX_FILE and flushed on a
+    later run. Rollback and success callbacks only live in memory and are run on
+    the UI thread through app._post_ui. With path None nothing is read or saved.
+    """
+    def __init__(self, app, path=OUTBOX_FILE):
+        self.app = app
+        self.path = path
+        self.actions = deque()
+        self.callbacks = {} # action id -> (on_success, rollback)
+        self.offline = False
+        self._cond = threading.Condition()
+        self._next_id = 0
+        self._thread = None
+
+    def __len__(self):
+        return len(self.actions)
+
+    def start(self):
+        self._load()
+        self._thread = threading.Thread(target=self._run, name="outbox", daemon=True)
+        self._thread.start()
+
+    def submit(self, kind, target, on_success=None, rollback=None, **params):
+        with self._cond:
+            # A vote/save still waiting in the queue is superseded by a newer one on
+            # the same target; keep the older rollback, it restores the original state.
+            for action in list(self.actions)[1:]:
+                if action['kind'] == kind and action['target'] == target and kind in ('vote', 'save'):
+                    action.update(params)
+                    self._save()
+                    return
+            self._next_id += 1
+            action = dict(id=f"{int(time.time())}-{self._next_id}", kind=kind, target=target, attempts=0, **params)
+            self.actions.append(action)
+            self.callbacks[action['id']] = (on_success, rollback)
+            self._save()
+            self._cond.notify()
+
+    def _load(self):
+        if self.path is None: return
+        try:
+            with open(self.path) as f:
+                self.actions.extend(json.load(f))
+        except FileNotFoundError:
+            pass
+        except (IOError, ValueError) as e:
+            self.app.set_status(f"Could not read {self.path}: {e}", True, 5)
+
+    def _save(self):
+        if self.path is None: return
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(list(self.actions), f)
+            os.replace(tmp_path, self.path)
+        except IOError as e:
+            msg = f"Could not save outbox: {e}" # `e` is unbound once the except block ends
+            self.app._post_ui(lambda: self.app.set_status(msg, True, 5))
+
+    def _finish(self, action, error=None, result=None):
+        with self._cond:
+            self.actions.popleft()
+            self._save()
+            on_success, rollback = self.callbacks.pop(action['id'], (None, None))
+        if error is None:
+            # Post even without a callback so the outbox counter repaints
+            self.app._post_ui(lambda: on_success(result) if on_success else None)
+        else:
+            def fail():
+                if rollback: rollback()
+                self.app.set_status(f"{action['kind'].capitalize()} failed: {error}", True, 5)
+            self.app._post_ui(fail)
+
+    def _run(self):
+        failures = 0
+        while True:
+            with self._cond:
+                while not self.actions:
+                    self._cond.wait()
+                action = self.actions[0]
+            delay = 0
+            try:
+                reddit = self.app._thread_reddit()
+                limits = reddit.auth.limits
+                if limits.get('remaining') is not None and limits['remaining'] < 1 and limits.get('reset_timestamp'):
+                    delay = max(0, limits['reset_timestamp'] - time.time())
+                else:
+                    with self.app.perf.span(f"action {action['kind']}", "net"):
+                        result = self._perform(reddit, action)
+                    self.offline = False
+                    failures = 0
+                    self._finish(action, result=result)
+                    continue
+            except prawcore.exceptions.RequestException:
+                # No connection: keep the action and retry until we are back online
+                self.offline = True
+                failures += 1
+                delay = min(ACTION_RETRY_MAX, ACTION_RETRY_BASE * 2 ** (failures - 1))
+            except (prawcore.exceptions.ServerError, prawcore.exceptions.TooManyRequests) as e:
+                self.offline = False
+                failures += 1
+                action['attempts'] += 1
+                if action['attempts'] >= ACTION_MAX_ATTEMPTS:
+                    self._finish(action, error=e)
+                    continue
+                delay = min(ACTION_RETRY_MAX, ACTION_RETRY_BASE * 2 ** (failures - 1))
+            except praw.exceptions.RedditAPIException as e:
+                wait = self._ratelimit_seconds(e)
+                if wait is None:
+                    self._finish(action, error=e)
+                    continue
+                delay = wait
+            except Exception as e:
+                self._finish(action, error=e)
+                continue
+            with self._cond:
+                self._save()
+            self.app._post_ui(lambda: None) # Repaint the offline/outbox indicator
+            with self._cond:
+                self._cond.wait(delay)
+
+    def _perform(self, reddit, action):
+        kind_prefix, thing_id = action['target'].split('_', 1)
+        thing = reddit.submission(id=thing_id) if kind_prefix == 't3' else reddit.comment(id=thing_id)
+        kind = action['kind']
+        if kind == 'vote':
+            if action['direction'] == 1: thing.upvote()
+            elif action['direction'] == -1: thing.downvote()
+            else: thing.clear_vote()
+        elif kind == 'save':
+            thing.save() if action['saved'] else thing.unsave()
+        elif kind == 'reply':
+            return thing.reply(action['text'])
+
+    @staticmethod
+    def _ratelimit_seconds(exc):
+        """Seconds to wait for a RATELIMIT API error, None for any other API error."""
+        for item in exc.items:
+            if item.error_type != "RATELIMIT": continue
+            match = re.search(r"(\d+)\s*(millisecond|second|minute)", item.message)
+            if not match: return 60
+            amount, unit = int(match.group(1)), match.group(2)
+            return amount / 1000 if unit == 'millisecond' else amount * (60 if unit == 'minute' else 1)
+        return None
+
+
+# --- Seen State ---
+class SeenStore:
+    """Bloom filter of post ids the user has opened or scrolled past, mmapped from SEEN_FILE.
+
+    The file has a fixed size however many ids are added; the cost is that a small
+    fraction of unseen posts will show as seen.
+    """
+    _HEADER = struct.Struct("<8sQI4x")
+    _MAGIC = b"REDSEEN1"
+
+    def __init__(self, path=SEEN_FILE, bits=SEEN_BLOOM_BITS, hashes=SEEN_BLOOM_HASHES):
+        self.path = path
+        self.bits, self.hashes = bits, hashes
+        self.session = set() # Ids added this run; these are never hidden
+        self.error = None
+        self._memo = {} # post id -> seen, so repaints don't rehash
+        self._file = None
+        self._map = None
+
+    def open(self):
+        size = self._HEADER.size + self.bits // 8
+        if self.path is None: # This session only
+            self._map = bytearray(size); return
+        try:
+            self._file = open(self.path, 'r+b' if os.path.exists(self.path) else 'w+b')
+            if os.fstat(self._file.fileno()).st_size == 0:
+                self._file.write(self._HEADER.pack(self._MAGIC, self.bits, self.hashes))
+                self._file.truncate(size) # Sparse on most filesystems until bits are set
+                self._file.flush()
+            self._map = mmap.mmap(self._file.fileno(), 0)
+            magic, bits, hashes = self._HEADER.unpack_from(self._map)
+            if magic != self._MAGIC or len(self._map) != self._HEADER.size + bits // 8:
+                raise ValueError(f"{self.path} is not a seen-state file")
+            self.bits, self.hashes = bits, hashes # An existing file keeps the geometry it was created with
+        except (OSError, ValueError, struct.error) as e:
+            self.error = f"Seen state not saved: {e}"
+            self.close()
+            self._map = bytearray(size) # Still track this session in memory
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.flush()
+            self._map.close()
+        if self._file:
+            self._file.close()
+        self._file = self._map = None
+
+    def _positions(self, post_id):
+        digest = hashlib.blake2b(post_id.encode(), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return [self._HEADER.size * 8 + (h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def __contains__(self, post_id):
+        seen = self._memo.get(post_id)
+        if seen is None:
+            if self._map is None: return False
+            seen = self._memo[post_id] = all(self._map[p >> 3] >> (p & 7) & 1 for p in self._positions(post_id))
+        return seen
+
+    def add(self, post_id):
+        self.session.add(post_id)
+        if self._memo.get(post_id) or self._map is None: return
+        for p in self._positions(post_id):
+            self._map[p >> 3] |= 1 << (p & 7)
+        self._memo[post_id] = True
+
+    def hides(self, post_id):
+        """Seen on an earlier visit; posts seen this run stay listed so the selection doesn't vanish."""
+        return post_id in self and post_id not in self.session
+
+
+# --- Content Filters ---
+_FILTER_WORD = re.compile(r"\w+")
+_PATTERN_FLAGS = re.compile(r"\(\?([aiLmsux]+)\)") # Leading global flags, e.g. (?i)
+_PATTERN_LEAD = re.compile(r"\\[bBAdDwWsS]|\[(?:\\.|[^\]\\])+\]|\^") # First token when it isn't a literal
+_PATTERN_UNJOINABLE = re.compile(r"\(\?P|\\[1-9]|\\g<") # Group names and backreferences clash when joined
+
+def _filter_entries(value, commas=True):
+    """Splits a [Filters] value into entries, one per line (and per comma unless `commas` is False)."""
+    entries = value.splitlines()
+    if commas: entries = [part for entry in entries for part in entry.split(',')]
+    return [entry.strip() for entry in entries if entry.strip()]
+
+def _trie_regex(phrases):
+    """Regex source matching any of `phrases`, factored into a trie so each position follows one branch."""
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for ch in phrase: node = node.setdefault(ch, {})
+        node[''] = {} # End of a phrase
+
+    def emit(node):
+        ends = '' in node
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches: return ''
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if ends: body = "(?:" + body + ")?"
+        return body
+    return emit(trie)
+
+def _combine_patterns(patterns):
+    """Compiles user regexes into as few scans as pays off.
+
+    Patterns that start with a literal keep a scan of their own, since sre finds
+    a literal prefix with a fast search that an alternation would lose. The others
+    are joined per (flags, leading token): sre factors the shared token out of the
+    alternation, so e.g. a hundred \\bword\\d+ rules cost about one scan instead of
+    one each. Patterns that use group names or backreferences stay on their own.
+    """
+    compiled, groups = [], {}
+    for pattern in patterns:
+        flags = _PATTERN_FLAGS.match(pattern)
+        body = pattern[flags.end():] if flags else pattern
+        lead = _PATTERN_LEAD.match(body)
+        if lead is None or _PATTERN_UNJOINABLE.search(body):
+            compiled.append(re.compile(pattern))
+        else:
+            groups.setdefault((flags.group(1) if flags else "", lead.group()), []).append(body)
+    for (flags, _), bodies in groups.items():
+        prefix = f"(?{flags})" if flags else ""
+        try:
+            compiled.append(re.compile(prefix + "|".join(f"(?:{body})" for body in bodies)))
+        except re.error: # e.g. conflicting inline flags inside the bodies
+            compiled.extend(re.compile(prefix + body) for body in bodies)
+    return compiled
+
+class ContentFilter:
+    """Killfile rules compiled once, then applied to posts and comments as they are fetched."""
+    def __init__(self, keywords=(), patterns=(), authors=(), domains=(), flairs=()):
+        self.errors = []
+        words, phrases = set(), []
+        for keyword in keywords:
+            keyword = keyword.casefold()
+            if _FILTER_WORD.fullmatch(keyword):
+                words.add(keyword) # Plain words are a set lookup per token, however many rules there are
+            else:
+                phrases.append(keyword)
+        self.words = frozenset(words)
+        # All phrases share one trie-shaped regex, run against casefolded text: IGNORECASE would disable
+        # sre's literal prefix scan, which is most of the speed
+        self.phrases = re.compile(r"(?<!\w)" + _trie_regex(phrases) + r"(?!\w)") if phrases else None
+        # User regexes are case-sensitive (use (?i) or (?i:...)) and combined by _combine_patterns
+        valid = []
+        for pattern in patterns:
+            try:
+                re.compile(pattern)
+                valid.append(pattern)
+            except re.error as e:
+                self.errors.append(f"bad pattern {pattern!r}: {e}")
+        self.patterns = _combine_patterns(valid)
+        self.authors = frozenset(author.casefold().removeprefix("u/") for author in authors)
+        self.domains = frozenset(domain.casefold().removeprefix("www.") for domain in domains)
+        self.flairs = frozenset(flair.casefold() for flair in flairs)
+        self.active = bool(self.words or self.phrases or self.patterns or self.authors or self.domains or self.flairs)
+
+    @classmethod
+    def from_config(cls, config):
+        if not config.has_section('Filters'): return cls()
+        get = lambda key: config.get('Filters', key, raw=True, fallback='') # Rules may contain '%'
+        return cls(keywords=_filter_entries(get('Keywords')), patterns=_filter_entries(get('Patterns'), commas=False),
+                   authors=_filter_entries(get('Authors')), domains=_filter_entries(get('Domains')),
+                   flairs=_filter_entries(get('Flairs')))
+
+    def _text_matches(self, text):
+        if not text: return False
+        if self.words or self.phrases:
+            folded = text.casefold()
+            if self.words and not self.words.isdisjoint(_FILTER_WORD.findall(folded)): return True
+            if self.phrases and self.phrases.search(folded): return True
+        return any(pattern.search(text) for pattern in self.patterns)
+
+    def _author_matches(self, thing):
+        return bool(self.authors) and thing.author is not None and thing.author.name.casefold() in self.authors
+
+    def _domain_matches(self, domain):
+        labels = domain.casefold().split('.')
+        return any('.'.join(labels[i:]) in self.domains for i in range(len(labels) - 1)) # Rules cover subdomains
+
+    def hides_post(self, post):
+        return (self._author_matches(post)
+                or (self.flairs and (post.link_flair_text or '').strip().casefold() in self.flairs)
+                or (self.domains and self._domain_matches(post.domain))
+                or self._text_matches(post.title) or self._text_matches(post.selftext))
+
+    def hides_comment(self, comment):
+        if isinstance(comment, (PendingReply, praw.models.MoreComments)): return False
+        return (self._author_matches(comment)
+                or (self.flairs and (comment.author_flair_text or '').strip().casefold() in self.flairs)
+                or self._text_matches(comment.body))
+
+    def filter_posts(self, posts):
+        """Returns (kept posts, number hidden)."""
+        if not self.active: return posts, 0
+        kept = [post for post in posts if not self.hides_post(post)]
+        return kept, len(posts) - len(kept)
+
+    def filter_comments(self, comments):
+        """Returns (kept comments, number hidden); replies to a hidden comment are dropped with it when threading."""
+        if not self.active: return comments, 0
+        kept = [comment for comment in comments if not self.hides_comment(comment)]
+        return kept, len(comments) - len(kept)
+
+def benchmark_content_filter(posts=1000, rules=150):
+    """Times ContentFilter against one scan per pattern, for literal and non-literal patterns."""
+    rng = random.Random(34)
+    vocab = [''.join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(3, 9))) for _ in range(3000)]
+    texts = [' '.join(rng.choice(vocab) + (str(rng.randint(0, 99)) if rng.random() < 0.05 else '')
+                      for _ in range(rng.randint(10, 300))) for _ in range(posts)]
+    shapes = {
+        "literal": lambda: rf"{rng.choice(vocab)}[- ]?{rng.choice(vocab)}",
+        "boundary": lambda: rf"\b{rng.choice(vocab)}\d+",
+        "class": lambda: rf"[A-Z]{rng.choice(vocab)}",
+        "mixed": lambda: rng.choice([rf"{rng.choice(vocab)} {rng.choice(vocab)}", rf"\b{rng.choice(vocab)}\d+",
+                                     rf"(?i)\b{rng.choice(vocab)}s?\b", rf"\d+ {rng.choice(vocab)}"]),
+    }
+    results = []
+    for name, make in shapes.items():
+        patterns = [make() for _ in range(rules)]
+        separate = [re.compile(pattern) for pattern in patterns]
+        content_filter = ContentFilter(patterns=patterns)
+        timings, hidden = [], []
+        for matches in (lambda t: any(p.search(t) for p in separate), content_filter._text_matches):
+            start = time.perf_counter()
+            hidden.append(sum(1 for text in texts if matches(text)))
+            timings.append(time.perf_counter() - start)
+        assert hidden[0] == hidden[1], (name, hidden)
+        results.append((name, timings[0], timings[1], len(content_filter.patterns)))
+    return results
+
+
+# --- Record / Replay ---
+# PRAW takes a custom prawcore Requestor, which sees every HTTP exchange (including
+# the OAuth token request) below the rate limiter and retry logic, so nothing above
+# it changes between live, recorded and replayed sessions.
+REPLAY_DROPPED_HEADERS = ("x-ratelimit-remaining", "x-ratelimit-used", "x-ratelimit-reset") # Would make prawcore pace replays
+
+def _exchange_key(method, url, params, data):
+    """Identifies a request for replay; token requests are keyed without their (secret) form data."""
+    if isinstance(data, dict): data = sorted(data.items())
+    if url.endswith("/access_token"): data = None
+    return json.dumps([method.upper(), url, sorted((k, str(v)) for k, v in (params or {}).items()),
+                       [(k, str(v)) for k, v in data or ()]])
+
+class SessionRecorder:
+    """Writes every exchange of the session to a gzipped JSON Lines fixture."""
+    offline = False
+
+    def __init__(self, path):
+        self._file = gzip.open(path, 'wt', encoding='utf-8')
+        self._lock = threading.Lock() # Worker threads have their own PRAW instances but share this
+
+    def praw_kwargs(self):
+        return {'requestor_class': RecordingRequestor, 'requestor_kwargs': {'recorder': self}}
+
+    def record(self, method, url, params, data, response, elapsed):
+        body = response.content.decode('utf-8', 'replace')
+        if url.endswith("/access_token"):
+            try:
+                token = json.loads(body)
+                token['access_token'] = "replayed"
+                body = json.dumps(token)
+            except ValueError:
+                pass
+        line = json.dumps({
+            "key": _exchange_key(method, url, params, data), "status": response.status_code,
+            "headers": {k: v for k, v in response.headers.items() if k.lower() != 'set-cookie'},
+            "body": body, "elapsed": round(elapsed, 4),
+        })
+        with self._lock:
+            if self._file: self._file.write(line + '\n')
+
+    def close(self):
+        with self._lock:
+            if self._file: self._file.close()
+            self._file = None
+
+class SessionReplay:
+    """Serves the exchanges of a recorded fixture, in recorded order per request, with scaled latency."""
+    offline = True
+
+    def __init__(self, path, latency_scale=1.0):
+        self.latency_scale = latency_scale
+        self.exchanges = {} # request key -> deque of recorded responses
+        self._lock = threading.Lock()
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            try:
+                for line in f:
+                    record = json.loads(line)
+                    self.exchanges.setdefault(record["key"], deque()).append(record)
+            except (EOFError, ValueError):
+                pass # Recording was cut short, keep what was written
+
+    def praw_kwargs(self):
+        return {'requestor_class': ReplayRequestor, 'requestor_kwargs': {'replay': self}}
+
+    def respond(self, method, url, params, data):
+        key = _exchange_key(method, url, params, data)
+        with self._lock:
+            recorded = self.exchanges.get(key)
+            if not recorded:
+                raise LookupError(f"no recorded response for {method.upper()} {url}")
+            # Repeated requests get the recorded responses in turn, then the last one again
+            record = recorded.popleft() if len(recorded) > 1 else recorded[0]
+        if self.latency_scale: time.sleep(record["elapsed"] * self.latency_scale)
+        response = requests.Response()
+        response.status_code = record["status"]
+        response.headers = requests.structures.CaseInsensitiveDict(
+            (k, v) for k, v in record["headers"].items() if k.lower() not in REPLAY_DROPPED_HEADERS)
+        response._content = record["body"].encode('utf-8')
+        response.encoding = 'utf-8'
+        response.url = url
+        return response
+
+    def close(self):
+        pass
+
+class RecordingRequestor(prawcore.Requestor):
+    def __init__(self, *args, recorder=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.recorder = recorder
+
+    def request(self, method, url, **kwargs):
+        start = time.perf_counter()
+        response = super().request(method, url, **kwargs)
+        self.recorder.record(method, url, kwargs.get('params'), kwargs.get('data'), response, time.perf_counter() - start)
+        return response
+
+class ReplayRequestor(prawcore.Requestor):
+    def __init__(self, *args, replay=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replay = replay
+
+    def request(self, method, url, **kwargs):
+        return self.replay.respond(method, url, kwargs.get('params'), kwargs.get('data'))
+
+
 # --- Main Application Class ---
 class RedditCursesApp:
-    def __init__(self, stdscr):
+    def __init__(self, stdscr, trace_file=None):
         # ... (keep most __init__ variables) ...
         self.stdscr = stdscr
         self.reddit = None
         self.current_view = VIEW_LIST
         self.active_pane = PANE_SUBS
+        self.perf = PerfMonitor(trace_file)
+        self.show_perf_overlay = False
+        self.username = None
+        self.actions = ActionQueue(self)
+        self.ui_events = queue.Queue() # Callables from background threads, run on the UI thread
+        self._wake_r = self._wake_w = None # Self-pipe waking the main loop for ui_events
+        self.markdown_cache = {} # "t1_<id>"/"t3_<id>" -> (source text, MarkdownDoc)
+        self.comment_source = {} # post_id -> comments as fetched (server order); self.comments holds them sorted
+        self.comment_sort = COMMENT_SORTS[0]
+        self._comment_blocks = {} # id(comment) -> (comment, layout signature, lines)
+        self._own_replies = set() # Ids of replies posted this session, kept on top of their siblings
+        self.comment_diff = {} # post_id -> (ids new since the last visit, {id: score change})
+        self._thread_downloads = set() # Post ids whose full comment tree is being downloaded
+        self.background = WorkerPool(1, "background") # Listing refreshes and live polls
+        self.download_pool = WorkerPool(THREAD_DOWNLOAD_WORKERS, "thread-download") # morechildren requests
+        self.live_thread = None # {'post_id', 'interval', 'due', 'polling'} while the open thread is followed live
+        self.find_query = None # Last '/' query, highlighted in the post and comments views
+        self._find_match = None # (LineFinder, position) of the match n/N continue from
+        self._scroll_to_selection = False
+        self._markdown_pending = set() # Post ids whose comments are being parsed in the background
+        self.link_picker = None # {'links': [(label, url)], 'index': n} while the picker is open
+        self._resize_pending = False
 
         # Data storage
-        self.posts = {}
+        self.posts = {} # (subreddit, listing mode) -> posts
+        self.listing_mode = DEFAULT_LISTING_MODE
+        self.content_filter = ContentFilter()
+        self.seen = SeenStore()
+        self.hide_seen = False
+        self._unseen_posts_cache = None # (posts list, posts not hidden as seen)
+        self._previous_listing = None # (subreddit, mode) the user left last, refreshed in the background
+        self._listing_positions = {} # (subreddit, mode) -> (post index, scroll top)
+        self._listing_refreshing = set()
+        self._listing_retry = {} # (subreddit, mode) -> (next retry time, current delay) after failed refreshes
         self.comments = {}
         self.current_sub_index = 0
         self.current_post_index = 0
@@ -121,6 +1262,11 @@ class RedditCursesApp:
         self.comment_limit = DEFAULT_COMMENT_LIMIT
         self.user_agent = DEFAULT_USER_AGENT
 
+        # Credentials of the authenticated session, reused for per-thread PRAW instances
+        self._praw_kwargs = None
+        self._thread_local = threading.local()
+        self.network = None # SessionRecorder or SessionReplay, when the session is recorded or replayed
+
         # Load config early
         self.config = configparser.ConfigParser()
         self.load_config()
@@ -136,7 +1282,19 @@ class RedditCursesApp:
                 self.target_subreddits = [sub.strip() for sub in self.target_subreddits if sub.strip()] # Clean up list
                 self.post_limit = self.config.getint('Settings', 'PostLimit', fallback=DEFAULT_POST_LIMIT)
                 self.comment_limit = self.config.getint('Settings', 'CommentLimit', fallback=DEFAULT_COMMENT_LIMIT)
+                self.listing_mode = self.config.get('Settings', 'ListingMode', fallback=DEFAULT_LISTING_MODE).strip()
+                if not is_valid_listing(self.listing_mode):
+                    self.set_status(f"Unknown ListingMode '{self.listing_mode}', using {DEFAULT_LISTING_MODE}.", True, 5)
+                    self.listing_mode = DEFAULT_LISTING_MODE
                 self.user_agent = self.config.get('Credentials', 'UserAgent', fallback=DEFAULT_USER_AGENT)
+                self.hide_seen = self.config.getboolean('Settings', 'HideSeen', fallback=False)
+                try:
+                    self.content_filter = ContentFilter.from_config(self.config)
+                except (configparser.Error, ValueError) as e: # A bad rule shouldn't cost the rest of the config
+                    self.content_filter = ContentFilter()
+                    self.set_status(f"[Filters] ignored: {e}", True, 5)
+                if self.content_filter.errors:
+                    self.set_status(f"[Filters] {self.content_filter.errors[0]}", True, 5)
 
             else:
                  self.set_status(f"Config file '{CONFIG_FILE}' not found, using defaults.", True, 5)
@@ -148,6 +1306,7 @@ class RedditCursesApp:
             self.target_subreddits = DEFAULT_TARGET_SUBREDDITS
             self.post_limit = DEFAULT_POST_LIMIT
             self.comment_limit = DEFAULT_COMMENT_LIMIT
+            self.listing_mode = DEFAULT_LISTING_MODE
             self.user_agent = DEFAULT_USER_AGENT
 
 
@@ -155,7 +1314,14 @@ class RedditCursesApp:
         # ... (same curses setup, add sticky color pair) ...
         curses.curs_set(0)
         self.stdscr.nodelay(1)
-        self.stdscr.timeout(100)
+        if os.name == 'nt':
+            self.stdscr.timeout(100) # No select() on console handles, keep polling
+        else:
+            self._wake_r, self._wake_w = os.pipe()
+            os.set_blocking(self._wake_r, False)
+            os.set_blocking(self._wake_w, False)
+            if hasattr(signal, 'SIGWINCH'):
+                signal.signal(signal.SIGWINCH, self._on_sigwinch)
 
         curses.start_color()
         curses.use_default_colors()
@@ -194,9 +1360,22 @@ class RedditCursesApp:
             "loading": curses.color_pair(12 + len(COLOR_COMMENT_DEPTH_FG) + 1) | curses.A_BOLD,
             "comment": curses.color_pair(10),
             "comment_meta": curses.color_pair(11),
+            "comment_new": curses.color_pair(8) | curses.A_BOLD,
+            "find": curses.A_REVERSE | curses.A_BOLD,
             "comment_depth": [curses.color_pair(12 + i) for i in range(len(COLOR_COMMENT_DEPTH_FG))]
         }
         self.attr["normal"] = curses.A_NORMAL
+        # Markdown span styles; "text" is replaced by the caller's base attribute
+        self.attr["md"] = {
+            "text": None,
+            "bold": curses.A_BOLD,
+            "italic": getattr(curses, 'A_ITALIC', curses.A_UNDERLINE),
+            "strike": curses.A_DIM,
+            "code": curses.color_pair(3),
+            "link": curses.color_pair(8) | curses.A_UNDERLINE,
+            "quote": curses.color_pair(4),
+            "heading": self.attr["title"],
+        }
 
 
     # ... (keep get_layout, create_windows, set_status, draw_status, draw_pane_border) ...
@@ -238,6 +1417,7 @@ class RedditCursesApp:
             self.status_message = message
             self.temp_status_message = None
 
+    @timed("draw_status")
     def draw_status(self, max_w):
         # ... (update hints for new 'l' key) ...
         self.status_win.erase()
@@ -249,18 +1429,21 @@ class RedditCursesApp:
         elif self.temp_status_message and time.time() >= self.temp_status_timer:
             self.temp_status_message = None # Expired
 
+        if self.actions:
+            current_status = f"[{'offline' if self.actions.offline else 'outbox'}: {len(self.actions)}] {current_status}"
         safe_addstr(self.status_win, 0, 0, current_status[:max_w-1], self.attr["status"])
 
         hints = ""
         if self.current_view == VIEW_LIST:
-             hints = "Arrows:Nav|Tab:Pane|Enter:Select|c:Comments|o:Open|r:Refresh|q:Quit"
+             hints = "Arrows:Nav|Tab:Pane|Enter:Select|c:Comments|o:Open|m/t:Mode|H:Seen|u/d:Vote|s:Save|r:Refresh|P:Perf|q:Quit"
         elif self.current_view == VIEW_POST:
-             hints = "Arrows/PgUp/Dn:Scroll|o:Open Link|q/Esc:Back"
+             hints = "Arrows/PgUp/Dn:Scroll|/,n/N:Find|o:Open Link|u/d:Vote|s:Save|R:Reply|q/Esc:Back"
         elif self.current_view == VIEW_COMMENTS:
-             hints = "Arrows/PgUp/Dn:Scroll|l:LoadMore|o:Open Post|q/Esc:Back" # Added 'l'
+             hints = "Arrows/PgUp/Dn:Scroll|/,n/N:Find|l/L:More/All|S:Sort|]/[:New|F:Live|r:Reload|u/d:Vote|s:Save|R:Reply|C:Comment|o:Open|q/Esc:Back"
 
-        hints_x = max(1, max_w - len(hints) - 1)
-        safe_addstr(self.status_win, 0, hints_x, hints, self.attr["status"])
+        # Hints go right-aligned after the status and are cut rather than drawn over it
+        hints_x = max(str_width(current_status[:max_w-1]) + 2, max_w - len(hints) - 1)
+        safe_addstr(self.status_win, 0, hints_x, hints[:max(0, max_w - 1 - hints_x)], self.attr["status"])
         try:
             self.status_win.refresh()
         except curses.error: pass
@@ -272,6 +1455,7 @@ class RedditCursesApp:
         window.border(border_attr)
         safe_addstr(window, 0, 2, f" {title} ", title_attr)
 
+    @timed("draw_left_pane")
     def draw_left_pane(self, h, w):
         # ... (use self.target_subreddits) ...
         self.left_win.erase()
@@ -294,21 +1478,25 @@ class RedditCursesApp:
             self.left_win.refresh()
         except curses.error: pass
 
+    @timed("draw_right_pane")
     def draw_right_pane(self, h, w):
         # ... (add sticky indicator) ...
         self.right_win.erase()
         is_active = self.current_view == VIEW_LIST and self.active_pane == PANE_POSTS
         selected_sub = self.target_subreddits[self.current_sub_index]
-        self.draw_pane_border(self.right_win, f"r/{selected_sub}", is_active)
+        listing_key = (selected_sub, self.listing_mode)
+        self.draw_pane_border(self.right_win, f"r/{selected_sub} [{self.listing_mode}]", is_active)
 
-        current_posts = self.posts.get(selected_sub, [])
+        current_posts = self._current_posts()
         y_pos = 1
 
-        if not current_posts and selected_sub not in self.last_fetch_time:
+        if not current_posts and self.posts.get(listing_key):
+             safe_addstr(self.right_win, y_pos, 2, "(All posts seen, H to show them)", self.attr["normal"])
+        elif not current_posts and listing_key not in self.last_fetch_time:
              msg = "(Press Enter in left pane to load)"
              attr = self.attr["normal"]
              safe_addstr(self.right_win, y_pos, 2, msg, attr)
-        elif not current_posts and selected_sub in self.last_fetch_time:
+        elif not current_posts and listing_key in self.last_fetch_time:
              msg = "(No posts found or error)"
              attr = self.attr["error"]
              safe_addstr(self.right_win, y_pos, 2, msg, attr)
@@ -318,7 +1506,8 @@ class RedditCursesApp:
                 if post_idx >= len(current_posts) or y_pos >= h - 1: break
 
                 post = current_posts[post_idx]
-                attr = self.attr["normal"]
+                seen = post.id in self.seen
+                attr = self.attr["normal"] | (curses.A_DIM if seen else 0)
                 prefix = "  "
                 if post_idx == self.current_post_index:
                     attr = self.attr["highlight"]
@@ -340,14 +1529,14 @@ class RedditCursesApp:
                     safe_addstr(self.right_win, y_pos, 1, title_line, attr)
 
                     # Line 2: Metadata + Type/Sticky Indicator
-                    meta_line = f"  {score:>4}pts {comments:>3}c {author:<15} {time_str}"
-                    safe_addstr(self.right_win, y_pos + 1, 1, meta_line, self.attr["meta"])
+                    meta_line = f" {vote_arrow(post)}{score:>4}pts {comments:>3}c {author:<15} {time_str}"
+                    safe_addstr(self.right_win, y_pos + 1, 1, meta_line, self.attr["meta"] | (curses.A_DIM if seen else 0))
                     # Combine indicators
                     indicators = f"{sticky_indicator}{post_type_indicator}"
-                    indicator_x = w - len(indicators) - 2
+                    indicator_x = w - str_width(indicators) - 2
                     if post.stickied: # Draw sticky part in sticky color
                          safe_addstr(self.right_win, y_pos + 1, indicator_x, sticky_indicator, self.attr["sticky"])
-                         safe_addstr(self.right_win, y_pos + 1, indicator_x + len(sticky_indicator), post_type_indicator, post_type_attr)
+                         safe_addstr(self.right_win, y_pos + 1, indicator_x + str_width(sticky_indicator), post_type_indicator, post_type_attr)
                     else: # Just draw type indicator
                          safe_addstr(self.right_win, y_pos + 1, indicator_x, post_type_indicator, post_type_attr)
 
@@ -361,13 +1550,13 @@ class RedditCursesApp:
         except curses.error: pass
 
 
+    @timed("draw_post_view")
     def draw_post_view(self, h, w):
         # ... (minor refinements maybe, mostly the same) ...
         self.post_view_win.erase()
         self.draw_pane_border(self.post_view_win, "Post View", True)
 
-        selected_sub = self.target_subreddits[self.current_sub_index]
-        current_posts = self.posts.get(selected_sub, [])
+        current_posts = self._current_posts()
         if not current_posts or self.current_post_index >= len(current_posts):
             safe_addstr(self.post_view_win, 1, 2, "Error: Post not available.", self.attr["error"])
             self.post_view_win.refresh(); return
@@ -375,27 +1564,27 @@ class RedditCursesApp:
         post = current_posts[self.current_post_index]
         try:
             author = f"u/{post.author.name}" if post.author else "[deleted]"
-            meta_line = f"{post.score}pts | {post.num_comments}c | {author} | {format_timestamp(post.created_utc)} | r/{post.subreddit.display_name}"
+            meta_line = f"{vote_arrow(post)}{post.score}pts | {post.num_comments}c | {author} | {format_timestamp(post.created_utc)} | r/{post.subreddit.display_name}"
+            if getattr(post, 'saved', False): meta_line += " | saved"
             safe_addstr(self.post_view_win, 1, 2, post.title, self.attr["title"])
             safe_addstr(self.post_view_win, 2, 2, meta_line, self.attr["meta"])
             self.post_view_win.hline(3, 1, '-', w - 2)
 
-            content_to_display = post.selftext if post.is_self else f"Link Post URL:\n{post.url}"
-            lines = []
-            if content_to_display:
-                 for paragraph in content_to_display.split('\n'):
-                     lines.extend(textwrap.wrap(paragraph, width=w - 4, replace_whitespace=False, drop_whitespace=False))
+            lines = self._get_post_lines(post, w - 4)
 
             content_h = h - 5
+            matches = self._visible_find_matches(self.post_content_scroll_top, content_h)
             for i in range(content_h):
                 line_idx = self.post_content_scroll_top + i
                 if line_idx >= len(lines): break
-                safe_addstr(self.post_view_win, i + 4, 2, lines[line_idx])
+                self._draw_spans(self.post_view_win, i + 4, 2, lines[line_idx], self.attr["normal"])
+                if line_idx in matches:
+                    self._draw_find_matches(self.post_view_win, i + 4, 2, ''.join(text for text, _ in lines[line_idx]), matches[line_idx])
 
             if len(lines) > content_h:
                 scroll_perc = int(100 * (self.post_content_scroll_top + min(content_h, len(lines)-self.post_content_scroll_top)) / len(lines)) if len(lines) > 0 else 0
                 indicator = f"[{scroll_perc}%]"
-                safe_addstr(self.post_view_win, h - 1, w - len(indicator) - 2, indicator)
+                safe_addstr(self.post_view_win, h - 1, w - str_width(indicator) - 2, indicator)
 
         except Exception as e:
              safe_addstr(self.post_view_win, 1, 2, f"Error displaying post: {e}", self.attr["error"])
@@ -404,12 +1593,13 @@ class RedditCursesApp:
         except curses.error: pass
 
 
+    @timed("draw_comments_view")
     def draw_comments_view(self, h, w):
         # ... (Major changes for selection highlight and Load More text) ...
         self.comment_view_win.erase()
-        selected_sub = self.target_subreddits[self.current_sub_index]
-        post = self.posts.get(selected_sub, [])[self.current_post_index]
-        self.draw_pane_border(self.comment_view_win, f"Comments: {post.title[:w-20]}", True)
+        post = self._current_posts()[self.current_post_index]
+        live = " [live]" if self.live_thread and self.live_thread['post_id'] == post.id else ""
+        self.draw_pane_border(self.comment_view_win, f"Comments [{self.comment_sort}]{live}: {truncate_to_width(post.title, w - 36)}", True)
 
         post_id = post.id
         current_comments = self.comments.get(post_id, None) # Use None to distinguish not loaded vs empty
@@ -433,7 +1623,12 @@ class RedditCursesApp:
         else: # Comments exist, draw them
              # Generate or retrieve cached flattened list of drawable lines
              flat_comment_lines = self._get_or_create_comment_lines(post_id, current_comments, w)
+             new_ids = self.comment_diff.get(post_id, ((), None))[0]
+             if self._scroll_to_selection:
+                 self._scroll_to_selection = False
+                 self._scroll_comment_into_view(flat_comment_lines, h - 2)
 
+             matches = self._visible_find_matches(self.comment_scroll_top, h - 2)
              # Draw visible lines from the flattened list
              for i in range(h - 2):
                  line_idx = self.comment_scroll_top + i
@@ -454,7 +1649,7 @@ class RedditCursesApp:
                       # Make Load More text clearer
                       line_text = f"{'  ' * comment_obj.depth}>>> Load More ({comment_obj.count}) Press 'l' <<<"
                  elif line_in_comment_idx == 0: # Meta line
-                      line_attr = self.attr["comment_meta"]
+                      line_attr = self.attr["comment_new"] if comment_obj.id in new_ids else self.attr["comment_meta"]
                       # Add depth indicator color
                       depth_color_idx = comment_obj.depth % len(self.attr["comment_depth"])
                       depth_attr = self.attr["comment_depth"][depth_color_idx]
@@ -463,63 +1658,370 @@ class RedditCursesApp:
                  # Apply highlight background to ALL lines of the selected comment
                  if is_selected_comment:
                      # Get current fg color from attr pair
-                     fg_color = curses.pair_content(line_attr)[0] if curses.has_colors() else COLOR_HIGHLIGHT_FG
+                     fg_color = curses.pair_content(curses.pair_number(line_attr))[0] if curses.has_colors() else COLOR_HIGHLIGHT_FG
                      # Use highlight bg with original fg color
                      curses.init_pair(20, fg_color, COLOR_HIGHLIGHT_BG) # Use a temp pair number
                      line_attr = curses.color_pair(20)
 
 
-                 safe_addstr(self.comment_view_win, y_pos + i, 2, line_text, line_attr)
+                 if 'spans' in line_info:
+                     self._draw_spans(self.comment_view_win, y_pos + i, 2, line_info['spans'], line_attr, is_selected_comment)
+                 else:
+                     safe_addstr(self.comment_view_win, y_pos + i, 2, line_text, line_attr)
+                 if line_idx in matches:
+                     self._draw_find_matches(self.comment_view_win, y_pos + i, 2, line_text, matches[line_idx])
 
              # Scroll indicator
              if len(flat_comment_lines) > h - 2:
                  scroll_perc = int(100 * (self.comment_scroll_top + min(h - 2, len(flat_comment_lines)-self.comment_scroll_top)) / len(flat_comment_lines)) if len(flat_comment_lines) > 0 else 0
                  indicator = f"[{scroll_perc}%]"
-                 safe_addstr(self.comment_view_win, h - 1, w - len(indicator) - 2, indicator)
+                 safe_addstr(self.comment_view_win, h - 1, w - str_width(indicator) - 2, indicator)
 
         try:
             self.comment_view_win.refresh()
         except curses.error: pass
 
 
+    @timed("comment_layout")
     def _get_or_create_comment_lines(self, post_id, comments_list, width):
         """Generates or retrieves cached list of comment lines for drawing."""
         if hasattr(self, '_comment_lines_cache') and self._comment_lines_cache['post_id'] == post_id:
+            self.perf.count("comment_lines", True)
             return self._comment_lines_cache['lines']
+        self.perf.count("comment_lines", False)
 
-        # Generate new list
+        # Assemble from per-comment blocks, which survive re-sorting and new replies
         flat_list = []
         wrap_width = width - 4 # Width available for text wrapping
+        parse = post_id not in self._markdown_pending
+        diff = self.comment_diff.get(post_id, (set(), {}))
+        if len(self._comment_blocks) > COMMENT_BLOCK_CACHE_MAX: self._comment_blocks.clear()
         for c_idx, comment in enumerate(comments_list):
-              if isinstance(comment, praw.models.MoreComments):
-                  # Placeholder text is handled during drawing now
-                  flat_list.append({'obj': comment, 'line': "", 'idx': 0, 'c_idx': c_idx})
-                  continue
-
-              try:
-                    indent = "  " * comment.depth
-                    author = f"u/{comment.author.name}" if comment.author else "[deleted]"
-                    meta = f"{indent}{author} | {comment.score}pts | {format_timestamp(comment.created_utc)}"
-                    body = comment.body if comment.body else ""
-
-                    # Wrap body
-                    wrapped_body_lines = []
-                    for paragraph in body.split('\n'):
-                        wrapped_body_lines.extend(textwrap.wrap(paragraph, width=wrap_width,
-                                                                 replace_whitespace=False, drop_whitespace=False,
-                                                                 initial_indent=indent, subsequent_indent=indent))
-
-                    # Add meta line first, then body lines
-                    flat_list.append({'obj': comment, 'line': meta, 'idx': 0, 'c_idx': c_idx})
-                    for l_idx, line in enumerate(wrapped_body_lines):
-                        flat_list.append({'obj': comment, 'line': line, 'idx': l_idx + 1, 'c_idx': c_idx})
-              except Exception:
-                    flat_list.append({'obj': comment, 'line': f"{indent}[Error displaying comment]", 'idx': 0, 'c_idx': c_idx})
-
-        self._comment_lines_cache = {'post_id': post_id, 'lines': flat_list}
+            flat_list.extend(self._comment_entries(comment, c_idx, wrap_width, parse, diff))
+
+        self._comment_lines_cache = {'post_id': post_id, 'lines': flat_list, 'wrap_width': wrap_width}
         return flat_list
 
+    def _comment_entries(self, comment, c_idx, wrap_width, parse, diff):
+        new_ids, score_changes = diff
+        changes = (comment.id in new_ids, score_changes.get(comment.id)) if comment.id else (False, None)
+        entries = []
+        for line, spans, l_idx, starts in self._comment_block(comment, wrap_width, parse, changes):
+            entry = {'obj': comment, 'line': line, 'idx': l_idx, 'c_idx': c_idx, 'para': starts}
+            if spans is not None: entry['spans'] = spans
+            entries.append(entry)
+        return entries
+
+
+    def _comment_block(self, comment, wrap_width, parse, changes=(False, None)):
+        """(line, spans, idx, starts paragraph) tuples for one comment, cached until its width, text, score or state changes.
+
+        `changes` is (new since the last visit, score change since the last visit).
+        """
+        if isinstance(comment, praw.models.MoreComments):
+            return (("", None, 0, True),) # Placeholder text is handled during drawing now
+        signature = (wrap_width, comment.body, comment.score, comment.likes, getattr(comment, 'saved', False), parse, changes)
+        cached = self._comment_blocks.get(id(comment))
+        if cached is not None and cached[0] is comment and cached[1] == signature:
+            self.perf.count("comment_blocks", True)
+            return cached[2]
+        self.perf.count("comment_blocks", False)
+
+        indent = ""
+        try:
+              indent = "  " * comment.depth
+              author = f"u/{comment.author.name}" if comment.author else "[deleted]"
+              is_new, score_change = changes
+              score = f"{comment.score}pts ({score_change:+d})" if score_change else f"{comment.score}pts"
+              meta = f"{indent}{vote_arrow(comment)}{author} | {score} | {format_timestamp(comment.created_utc)}"
+              if isinstance(comment, PendingReply): meta += " | sending..."
+              elif getattr(comment, 'saved', False): meta += " | saved"
+              if is_new: meta += " | new"
+              body = comment.body if comment.body else ""
+
+              # Wrap body, as Markdown once it has been parsed
+              key = f"t1_{comment.id}" if comment.id else None
+              doc = self._markdown(key, body, parse=parse)
+              if doc is not None:
+                  wrapped_body_lines = layout_markdown(doc, wrap_width, indent)
+              else:
+                  wrapped_body_lines = [([(line, "text")], i == 0) for paragraph in body.split('\n')
+                                        for i, line in enumerate(wrap_text(paragraph, wrap_width, initial_indent=indent, subsequent_indent=indent))]
+
+              # Meta line first, then body lines; the flag marks lines that start a paragraph (for find)
+              block = [(meta, None, 0, True)]
+              for l_idx, (spans, starts) in enumerate(wrapped_body_lines):
+                  block.append((''.join(text for text, _ in spans), spans, l_idx + 1, starts))
+        except Exception:
+              block = [(f"{indent}[Error displaying comment]", None, 0, True)]
+        self._comment_blocks[id(comment)] = (comment, signature, block)
+        return block
+
+    def _apply_comment_sort(self, post_id):
+        """Rebuilds the display order of a loaded thread from comment_source, keeping the selection."""
+        source = self.comment_source.get(post_id)
+        if source is None: return
+        previous = self.comments.get(post_id) or []
+        selected = None
+        post = self._selected_post()
+        if self.current_view == VIEW_COMMENTS and post is not None and post.id == post_id and self.current_comment_index < len(previous):
+            selected = previous[self.current_comment_index]
+        with self.perf.span("comment_sort"):
+            ordered = sort_comments(source, self.comment_sort, self._own_replies)
+        self.comments[post_id] = ordered
+        if hasattr(self, '_comment_lines_cache'): del self._comment_lines_cache
+        if selected is not None:
+            for index, comment in enumerate(ordered):
+                if comment is selected:
+                    self.current_comment_index = index
+                    self._scroll_to_selection = True
+                    break
+
+    def _scroll_comment_into_view(self, flat_lines, content_h):
+        for line_idx, line_info in enumerate(flat_lines):
+            if line_info['c_idx'] == self.current_comment_index:
+                if not self.comment_scroll_top <= line_idx < self.comment_scroll_top + content_h:
+                    self.comment_scroll_top = max(0, min(line_idx, len(flat_lines) - content_h))
+                return
+
+    def _current_posts(self):
+        posts = self.posts.get((self.target_subreddits[self.current_sub_index], self.listing_mode), [])
+        if not self.hide_seen: return posts
+        cached = self._unseen_posts_cache
+        if cached is None or cached[0] is not posts:
+            cached = self._unseen_posts_cache = (posts, [post for post in posts if not self.seen.hides(post.id)])
+        return cached[1]
+
+    def toggle_hide_seen(self):
+        selected = self._selected_post()
+        self.hide_seen = not self.hide_seen
+        self._unseen_posts_cache = None
+        current_posts = self._current_posts()
+        self.current_post_index = next((i for i, post in enumerate(current_posts) if selected is not None and post.id == selected.id), 0)
+        self.post_scroll_top = min(self.post_scroll_top, self.current_post_index)
+        self.set_status("Hiding posts seen on earlier visits." if self.hide_seen else "Showing seen posts.")
+
+    def _selected_post(self):
+        current_posts = self._current_posts()
+        return current_posts[self.current_post_index] if self.current_post_index < len(current_posts) else None
+
+    def cycle_comment_sort(self, post):
+        self.comment_sort = COMMENT_SORTS[(COMMENT_SORTS.index(self.comment_sort) + 1) % len(COMMENT_SORTS)]
+        if self.comment_source.get(post.id):
+            self._apply_comment_sort(post.id) # Purely local, the tree is already here
+            self.set_status(f"Comments sorted by {self.comment_sort}.", True)
+        else:
+            self.fetch_comments(post) # Nothing usable cached, fetch (sorted on arrival)
+
+    # --- Markdown ---
+
+    def _markdown(self, key, text, parse=True):
+        """Parsed MarkdownDoc for a body, cached by thing key. None if not cached and parse is False."""
+        cached = self.markdown_cache.get(key)
+        if cached is not None and cached[0] == text:
+            self.perf.count("markdown", True)
+            return cached[1]
+        if not parse: return None
+        self.perf.count("markdown", False)
+        with self.perf.span("markdown_parse"):
+            doc = parse_markdown(text)
+        if len(self.markdown_cache) > MARKDOWN_CACHE_MAX: self.markdown_cache.clear()
+        if key is not None: self.markdown_cache[key] = (text, doc)
+        return doc
+
+    def _parse_markdown_in_background(self, post_id, comments):
+        """Parses the bodies of a big thread off the UI thread; the view shows plain text until done."""
+        todo = [(f"t1_{c.id}", c.body or "") for c in comments
+                if not isinstance(c, (praw.models.MoreComments, PendingReply))]
+        todo = [(key, body) for key, body in todo if self.markdown_cache.get(key, (None,))[0] != body]
+        if len(todo) < MARKDOWN_BACKGROUND_MIN: return
+        if len(self.markdown_cache) + len(todo) > MARKDOWN_CACHE_MAX: self.markdown_cache.clear()
+        self._markdown_pending.add(post_id)
+
+        def work():
+            with self.perf.span(f"markdown_background ({len(todo)})"):
+                for key, body in todo:
+                    self.markdown_cache[key] = (body, parse_markdown(body))
+            def done():
+                self._markdown_pending.discard(post_id)
+                if hasattr(self, '_comment_lines_cache') and self._comment_lines_cache['post_id'] == post_id:
+                    del self._comment_lines_cache
+            self._post_ui(done)
+        threading.Thread(target=work, name="markdown", daemon=True).start()
+
+    def _get_post_lines(self, post, width):
+        """Wrapped lines (lists of spans) of the post body, cached for the current post and width."""
+        cache = getattr(self, '_post_lines_cache', None)
+        if cache and cache['post'] is post and cache['width'] == width:
+            self.perf.count("post_lines", True)
+            return cache['lines']
+        self.perf.count("post_lines", False)
+        if post.is_self:
+            laid_out = layout_markdown(self._markdown(f"t3_{post.id}", post.selftext), width)
+        else:
+            laid_out = [([("Link Post URL:", "text")], True)] + [([(line, "link")], i == 0) for i, line in enumerate(wrap_text(post.url, width))]
+        lines = [spans for spans, _ in laid_out]
+        self._post_lines_cache = {'post': post, 'width': width, 'lines': lines, 'starts': [starts for _, starts in laid_out]}
+        return lines
+
+    # --- Find ---
+
+    def _view_finder(self):
+        """LineFinder over the laid out lines of the post or comments view, kept with the layout cache."""
+        post = self._selected_post()
+        if post is None: return None
+        if self.current_view == VIEW_COMMENTS:
+            comments = self.comments.get(post.id)
+            if not comments: return None
+            self._get_or_create_comment_lines(post.id, comments, self.comment_view_win.getmaxyx()[1])
+            cache = self._comment_lines_cache
+            if 'finder' not in cache:
+                with self.perf.span("find_index"):
+                    cache['finder'] = LineFinder((entry['line'], entry['para']) for entry in cache['lines'])
+            return cache['finder']
+        if self.current_view == VIEW_POST:
+            self._get_post_lines(post, self.post_view_win.getmaxyx()[1] - 4)
+            cache = self._post_lines_cache
+            if 'finder' not in cache:
+                cache['finder'] = LineFinder((''.join(text for text, _ in spans), starts) for spans, starts in zip(cache['lines'], cache['starts']))
+            return cache['finder']
+        return None
+
+    def _visible_find_matches(self, top, height):
+        if not self.find_query: return {}
+        finder = self._view_finder()
+        return finder.ranges(self.find_query, top, top + height) if finder else {}
+
+    def _draw_find_matches(self, window, y, x, text, ranges):
+        for start, end in ranges:
+            safe_addstr(window, y, x + str_width(text[:start]), text[start:end], self.attr["find"])
+
+    def _find_origin(self, finder):
+        """Where a new search starts: the selected comment, or the top of the post view."""
+        if self.current_view == VIEW_COMMENTS:
+            for line_idx, entry in enumerate(self._comment_lines_cache['lines']):
+                if entry['c_idx'] == self.current_comment_index: return finder.starts[line_idx]
+            return 0
+        line_idx = self.post_content_scroll_top
+        return finder.starts[line_idx] if line_idx < len(finder.starts) else 0
+
+    def _show_find_match(self, finder, pos, counted=True):
+        """Selects the comment holding the match and scrolls it into view, or reports no match.
+
+        The "match i of n" counter needs every match, so it's left out while the query is being typed.
+        """
+        self._find_match = (finder, pos) if pos is not None else None
+        if pos is None:
+            self.set_status(f"Not found: {self.find_query}", True); return
+        line = finder.line_of(pos)
+        if self.current_view == VIEW_COMMENTS:
+            self.current_comment_index = self._comment_lines_cache['lines'][line]['c_idx']
+            content_h = self.comment_view_win.getmaxyx()[0] - 2
+            if not self.comment_scroll_top <= line < self.comment_scroll_top + content_h:
+                self.comment_scroll_top = max(0, min(line - content_h // 3, len(finder.starts) - content_h))
+        else:
+            content_h = self.post_view_win.getmaxyx()[0] - 5
+            if not self.post_content_scroll_top <= line < self.post_content_scroll_top + content_h:
+                self.post_content_scroll_top = max(0, min(line - content_h // 3, len(finder.starts) - content_h))
+        if counted:
+            index, total = finder.ordinal(self.find_query, pos)
+            self.set_status(f"/{self.find_query}: match {index} of {total}", True)
+        else:
+            self.set_status(f"/{self.find_query}", True)
+
+    def find_in_view(self):
+        """Incremental '/': jumps to the first match after the selection as the query is typed, Esc goes back."""
+        finder = self._view_finder()
+        if finder is None: self.set_status("Nothing to search.", True); return
+        origin = (self.current_comment_index, self.comment_scroll_top, self.post_content_scroll_top)
+        start = self._find_origin(finder)
+
+        def on_change(text):
+            self.current_comment_index, self.comment_scroll_top, self.post_content_scroll_top = origin
+            self.find_query = text or None
+            if text: self._show_find_match(finder, finder.next(text, start), counted=False)
+            else: self._find_match = None
+            self.draw_ui()
+
+        if self.prompt("/", on_change) is None:
+            self.current_comment_index, self.comment_scroll_top, self.post_content_scroll_top = origin
+            self.find_query = self._find_match = None
+        elif self._find_match:
+            self._show_find_match(finder, self._find_match[1])
+
+    def find_next(self, step):
+        finder = self._view_finder()
+        if not self.find_query or finder is None:
+            self.set_status("No search, press / first.", True); return
+        match = self._find_match
+        if match and match[0] is finder: pos = match[1] + 1 if step > 0 else match[1]
+        else: pos = self._find_origin(finder) # Layout changed or another view, start from the selection
+        self._show_find_match(finder, finder.next(self.find_query, pos, step))
+
+    def _draw_spans(self, window, y, x, spans, base_attr, selected=False):
+        """Draws one line of styled spans; when selected only the style's flags are kept."""
+        h, w = window.getmaxyx()
+        for text, style in spans:
+            if x >= w - 1: break
+            style_attr = self.attr["md"].get(style)
+            if style_attr is None: attr = base_attr
+            elif selected: attr = base_attr | (style_attr & ~curses.A_COLOR)
+            else: attr = style_attr
+            safe_addstr(window, y, x, text, attr)
+            x += str_width(text)
+
+    # --- Link Picker ---
+
+    def open_links(self, links):
+        """Opens the only link directly, otherwise lets the user pick one."""
+        unique = {}
+        for label, url in links: unique.setdefault(url, label)
+        links = [(label, url) for url, label in unique.items()]
+        if len(links) == 1:
+            self.open_link_in_browser(links[0][1])
+        else:
+            self.link_picker = {'links': links, 'index': 0}
+
+    def draw_link_picker(self, content_h, max_w):
+        links = self.link_picker['links']
+        box_w = min(max_w - 4, 90)
+        box_h = min(content_h - 2, len(links) + 2)
+        if box_w < 20 or box_h < 3: return
+        try:
+            win = curses.newwin(box_h, box_w, (content_h - box_h) // 2, (max_w - box_w) // 2)
+        except curses.error:
+            return
+        win.erase()
+        self.draw_pane_border(win, "Open link (Enter, 1-9, Esc)", True)
+        visible = box_h - 2
+        top = max(0, self.link_picker['index'] - visible + 1)
+        for row, (label, url) in enumerate(links[top:top + visible]):
+            i = top + row
+            attr = self.attr["highlight"] | curses.A_REVERSE if i == self.link_picker['index'] else self.attr["normal"]
+            text = f"{i + 1:>2}. {label}" if label == url else f"{i + 1:>2}. {label} - {url}"
+            safe_addstr(win, row + 1, 1, truncate_to_width(text, box_w - 2).ljust(box_w - 2), attr)
+        try:
+            win.refresh()
+        except curses.error: pass
+
+    def _handle_link_picker_input(self, key, count=1):
+        links = self.link_picker['links']
+        index = self.link_picker['index']
+        if key == curses.KEY_DOWN or key == ord('j'):
+            self.link_picker['index'] = min(len(links) - 1, index + count)
+        elif key == curses.KEY_UP or key == ord('k'):
+            self.link_picker['index'] = max(0, index - count)
+        elif key == ord('\n') or key == curses.KEY_ENTER or ord('1') <= key <= ord('9'):
+            if ord('1') <= key <= ord('9'):
+                index = key - ord('1')
+                if index >= len(links): return
+            self.link_picker = None
+            url = links[index][1]
+            self.open_link_in_browser(f"https://www.reddit.com{url}" if url.startswith('/') else url)
+        elif key == ord('q') or key == 27:
+            self.link_picker = None
 
+    @timed("frame")
     def draw_ui(self):
         # ... (same as before) ...
         content_h, max_h, max_w, left_w, right_w, status_h = self.get_layout()
@@ -542,6 +2044,52 @@ class RedditCursesApp:
             self.draw_left_pane(content_h, left_w)
             self.draw_comments_view(content_h, right_w)
 
+        if self.link_picker:
+            self.draw_link_picker(content_h, max_w)
+        if self.show_perf_overlay:
+            self.draw_perf_overlay(content_h, max_w)
+
+    def draw_perf_overlay(self, content_h, max_w):
+        """Small box in the bottom right corner with live timing statistics."""
+        def pcts(name):
+            values = self.perf.percentiles(name)
+            if values is None: return "-"
+            return " ".join(f"p{p} {format_duration(v)}" for p, v in zip((50, 95, 99), values))
+
+        hist_labels = [f"<{format_duration(b)}" for b in NET_LATENCY_BUCKETS] + [f">{format_duration(NET_LATENCY_BUCKETS[-1])}"]
+        hist = " ".join(f"{label}:{n}" for label, n in zip(hist_labels, self.perf.net_histogram))
+        def hit_rate(name):
+            rate, total = self.perf.hit_rate(name)
+            return f"{rate:.0%}/{total}" if rate is not None else "-"
+        cache = f"lines {hit_rate('comment_lines')} md {hit_rate('markdown')}"
+        rss = self.perf.rss_bytes()
+
+        lines = [
+            ("frame", pcts("frame")),
+            ("key>paint", pcts("key_to_paint")),
+            ("input", pcts("input")),
+            ("layout", pcts("comment_layout")),
+            ("net posts", pcts("fetch_posts")),
+            ("net cmts", pcts("fetch_comments")),
+            ("net hist", hist),
+            ("caches", cache),
+            ("rss", f"{rss / 1048576:.1f} MB" if rss else "-"),
+        ]
+        box_w = min(max_w, PERF_OVERLAY_WIDTH)
+        box_h = min(content_h, len(lines) + 2)
+        try:
+            win = curses.newwin(box_h, box_w, content_h - box_h, max_w - box_w)
+        except curses.error:
+            return
+        win.erase()
+        self.draw_pane_border(win, "Perf (P)", True)
+        for i, (label, value) in enumerate(lines[:box_h - 2]):
+            safe_addstr(win, i + 1, 1, f"{label:<10}", self.attr["meta"])
+            safe_addstr(win, i + 1, 12, value[:box_w - 13])
+        try:
+            win.refresh()
+        except curses.error: pass
+
 
     def handle_resize(self):
         # ... (same as before) ...
@@ -568,6 +2116,8 @@ class RedditCursesApp:
                 password = self.config.get('Credentials', 'Password', fallback=None)
                 # User agent already loaded in load_config
 
+            if not all([client_id, client_secret, username, password]) and self.network and self.network.offline:
+                client_id = client_secret = username = password = "replay" # Never leaves the process
             if not all([client_id, client_secret, username, password, self.user_agent]):
                 print(f"INFO: Credentials missing in {CONFIG_FILE} or invalid. Falling back to prompts.")
                 client_id = input("Enter Reddit Client ID: ")
@@ -579,7 +2129,7 @@ class RedditCursesApp:
 
 
             print("Authenticating with Reddit...")
-            self.reddit = praw.Reddit(
+            self._praw_kwargs = dict(
                 client_id=client_id.strip(),
                 client_secret=client_secret.strip(),
                 user_agent=self.user_agent.strip(),
@@ -587,9 +2137,12 @@ class RedditCursesApp:
                 password=password.strip(),
                 check_for_async=False
             )
+            if self.network: self._praw_kwargs.update(self.network.praw_kwargs())
+            self.reddit = praw.Reddit(**self._praw_kwargs)
             user_me = self.reddit.user.me()
             if user_me is None: raise praw.exceptions.AuthenticationException("Authentication failed, user is None.")
             print(f"Authentication successful as u/{user_me.name}")
+            self.username = user_me.name
             self.set_status(f"u/{user_me.name} | Select subreddit and press Enter")
             return True
 
@@ -606,29 +2159,371 @@ class RedditCursesApp:
              self.set_status(f"Authentication Failed: {e}")
              time.sleep(3); return False
 
-    def fetch_posts(self, sub_name):
+    def _thread_reddit(self):
+        """PRAW instance private to the calling thread (PRAW itself is not thread safe)."""
+        if threading.current_thread() is threading.main_thread():
+            return self.reddit
+        reddit = getattr(self._thread_local, 'reddit', None)
+        if reddit is None:
+            reddit = self._thread_local.reddit = praw.Reddit(**self._praw_kwargs)
+        return reddit
+
+    @timed("fetch_posts", "net")
+    def fetch_posts(self, sub_name, listing=None):
         if not self.reddit: self.set_status("Error: Not authenticated.", True); return
+        listing = listing or self.listing_mode
+        key = (sub_name, listing)
         # Show loading indicator
-        draw_loading_pane(self.right_win, f"Fetching r/{sub_name}...")
-        self.set_status(f"Fetching posts for r/{sub_name}...")
+        draw_loading_pane(self.right_win, f"Fetching r/{sub_name} [{listing}]...")
+        self.set_status(f"Fetching {listing} posts for r/{sub_name}...")
 
         try:
-            subreddit = self.reddit.subreddit(sub_name)
-            fetched_posts = list(subreddit.new(limit=self.post_limit)) # Use config limit
-            self.posts[sub_name] = fetched_posts
-            self.last_fetch_time[sub_name] = time.time()
-            self.set_status(f"Loaded {len(fetched_posts)} posts from r/{sub_name}.")
+            fetched_posts = list(listing_generator(self.reddit, sub_name, listing, self.post_limit)) # Use config limit
+            with self.perf.span("filter_posts"):
+                fetched_posts, hidden = self.content_filter.filter_posts(fetched_posts)
+            self.posts[key] = fetched_posts
+            self.last_fetch_time[key] = time.time()
+            self.set_status(f"Loaded {len(fetched_posts)} posts from r/{sub_name} [{listing}]" + (f", {hidden} hidden by filters." if hidden else "."))
             self.current_post_index = 0
             self.post_scroll_top = 0
         except praw.exceptions.PRAWException as e:
-             self.posts[sub_name] = []
+             self.posts[key] = []
              self.set_status(f"Error fetching r/{sub_name}: {e}", True)
         except Exception as e:
-             self.posts[sub_name] = []
+             self.posts[key] = []
              self.set_status(f"Unexpected error fetching r/{sub_name}: {e}", True)
         # No finally needed, draw_ui in main loop will redraw correctly
 
 
+    def _listing_stale(self, key):
+        fetched = self.last_fetch_time.get(key)
+        return fetched is None or time.time() - fetched >= LISTING_TTL[key[1].partition(':')[0]]
+
+    def refresh_listing_in_background(self, key):
+        """Refetches a listing off the UI thread; the selection follows the same post if it is visible."""
+        if key in self._listing_refreshing or not self.reddit: return
+        self._listing_refreshing.add(key)
+        sub_name, listing = key
+
+        def work():
+            try:
+                with self.perf.span("fetch_posts_background", "net"):
+                    fetched = list(listing_generator(self._thread_reddit(), sub_name, listing, self.post_limit))
+                fetched, _ = self.content_filter.filter_posts(fetched)
+                error = None
+            except Exception as e:
+                fetched, error = None, e
+
+            def apply():
+                self._listing_refreshing.discard(key)
+                if error is not None:
+                    # Back off instead of retrying on every timer tick while offline
+                    delay = min(LISTING_RETRY_MAX, self._listing_retry.get(key, (0, LISTING_RETRY_MIN / 2))[1] * 2)
+                    self._listing_retry[key] = (time.time() + delay, delay)
+                    self.set_status(f"Background refresh of r/{sub_name} [{listing}] failed: {error} (retry in {delay:.0f}s)", True)
+                    return
+                self._listing_retry.pop(key, None)
+                visible = key == (self.target_subreddits[self.current_sub_index], self.listing_mode)
+                selected = self._selected_post() if visible else None
+                if self.current_view != VIEW_LIST and selected is not None and all(post.id != selected.id for post in fetched):
+                    fetched.insert(0, selected) # The open post dropped out of the listing, keep showing it
+                self.posts[key] = fetched
+                self.last_fetch_time[key] = time.time()
+                if visible:
+                    current_posts = self._current_posts()
+                    index = next((i for i, post in enumerate(current_posts) if selected is not None and post.id == selected.id), 0)
+                    self.current_post_index = index
+                    self.post_scroll_top = min(self.post_scroll_top, index)
+            self._post_ui(apply)
+        self.background.submit(work)
+
+    def switch_listing(self, listing):
+        """Shows another listing mode; cached listings appear at once and refresh in the background if stale."""
+        if listing == self.listing_mode: return
+        sub_name = self.target_subreddits[self.current_sub_index]
+        old_key, new_key = (sub_name, self.listing_mode), (sub_name, listing)
+        self._listing_positions[old_key] = (self.current_post_index, self.post_scroll_top)
+        self._previous_listing = old_key
+        self.listing_mode = listing
+        self.current_post_index, self.post_scroll_top = self._listing_positions.get(new_key, (0, 0))
+        if new_key not in self.posts:
+            self.fetch_posts(sub_name, listing)
+        else:
+            self.set_status(f"r/{sub_name} [{listing}]")
+            if self._listing_stale(new_key): self.refresh_listing_in_background(new_key)
+
+    def _run_timers(self):
+        """Work scheduled by _timer_deadlines that is due now."""
+        live = self.live_thread
+        if live:
+            post = self._selected_post()
+            if self.current_view != VIEW_COMMENTS or post is None or post.id != live['post_id']:
+                self.live_thread = None # Left the thread
+            elif not live['polling'] and time.time() >= live['due']:
+                if post.id in self._thread_downloads: live['due'] = time.time() + live['interval']
+                else: self._poll_live_thread(live)
+        previous = self._previous_listing
+        if previous and previous in self.posts and self._listing_stale(previous) \
+                and time.time() >= self._listing_retry.get(previous, (0, 0))[0]:
+            # Keep the mode the user came from warm so switching back stays instant
+            self.refresh_listing_in_background(previous)
+
+    @timed("revisit_comments", "net")
+    def revisit_comments(self, post):
+        """Merges the newest comments into a thread that is already loaded and marks what changed.
+
+        Reddit can't list comments newer than a time, so this asks for the newest
+        REVISIT_COMMENT_LIMIT (sort=new, no MoreComments expansion) instead of the
+        whole tree; new replies under branches that were never loaded stay collapsed.
+        The status says when that, or a window of nothing but new comments, may hide some.
+        """
+        if not self.reddit: self.set_status("Error: Not authenticated.", True); return
+        post_id = post.id
+        self.set_status(f"Checking {post_id} for new comments...")
+        try:
+            fetched_comments, skipped = fetch_newest_comments(self.reddit, post_id)
+        except Exception as e:
+            self.set_status(f"Error checking for new comments: {e}", True)
+            return
+        window_full = len(fetched_comments) >= REVISIT_COMMENT_LIMIT
+        with self.perf.span("filter_comments"):
+            fetched_comments, _ = self.content_filter.filter_comments(fetched_comments)
+
+        known, collapsed = set(), set()
+        for c in self.comment_source[post_id]:
+            if isinstance(c, praw.models.MoreComments): collapsed.update(c.children)
+            elif not isinstance(c, PendingReply): known.add(c.id)
+        added, score_changes = self._merge_new_comments(post_id, fetched_comments)
+        new_ids = {comment.id for comment in added}
+        self.comment_diff[post_id] = (new_ids, score_changes)
+        self._apply_comment_sort(post_id)
+        # The window may have been too small, or new replies sit under unexpanded or unloaded branches
+        seen = known | collapsed | new_ids
+        unseen = sum(1 for c in fetched_comments if c.id not in seen)
+        unseen += sum(1 for more in skipped for child in more.children if child not in seen)
+        window_full = window_full and not known.intersection(c.id for c in fetched_comments)
+        status = f"{len(new_ids)} new comments, {len(score_changes)} score changes"
+        if new_ids: status += " (] / [ to jump)"
+        if window_full: status += f"; all {len(fetched_comments)} fetched are new, some may be missing (r: full reload)"
+        elif unseen: status += f"; {unseen} more in collapsed branches (r: full reload)"
+        self.set_status(status + ".")
+
+    def _merge_new_comments(self, post_id, fetched_comments, update_existing=True):
+        """Appends fetched comments that aren't loaded yet to comment_source; returns (added, {id: score change}).
+
+        Comments whose parent isn't loaded are skipped, their branch stays collapsed.
+        """
+        source = self.comment_source[post_id]
+        known = {c.id: c for c in source if not isinstance(c, (praw.models.MoreComments, PendingReply))}
+        parents = {f"t1_{comment_id}" for comment_id in known} | {f"t3_{post_id}"}
+        added, score_changes = [], {}
+        for comment in fetched_comments:
+            if isinstance(comment, praw.models.MoreComments): continue
+            old = known.get(comment.id)
+            if old is not None:
+                if not update_existing: continue
+                if comment.score != old.score: score_changes[comment.id] = comment.score - old.score
+                old.score, old.body = comment.score, comment.body # Keep the old object, it carries local state
+            elif comment.parent_id in parents:
+                added.append(comment)
+                parents.add(f"t1_{comment.id}")
+        self.comment_source[post_id] = source + added
+        self.last_fetch_time[post_id] = time.time()
+        self._parse_markdown_in_background(post_id, added)
+        return added, score_changes
+
+    def toggle_live(self, post):
+        if self.live_thread and self.live_thread['post_id'] == post.id:
+            self.live_thread = None
+            self.set_status("Live updates off.", True); return
+        if not self.comment_source.get(post.id):
+            self.set_status("Load the comments first.", True); return
+        self.live_thread = {'post_id': post.id, 'interval': LIVE_POLL_MIN, 'due': time.time(), 'polling': False}
+        self.set_status("Following thread live; new comments are marked, ] jumps to them.", True)
+
+    def _poll_live_thread(self, live):
+        """Fetches the newest comments off the UI thread and inserts the unseen ones into the open tree."""
+        live['polling'] = True
+        post_id = live['post_id']
+
+        def work():
+            try:
+                with self.perf.span("live_poll", "net"):
+                    fetched, _ = fetch_newest_comments(self._thread_reddit(), post_id)
+                fetched, _ = self.content_filter.filter_comments(fetched)
+                error = None
+            except Exception as e:
+                fetched, error = None, e
+
+            def apply():
+                live['polling'] = False
+                if self.live_thread is not live: return # Turned off or left meanwhile
+                if error is not None:
+                    live['interval'] = min(LIVE_POLL_MAX, live['interval'] * 2)
+                    self.set_status(f"Live update failed: {error}", True)
+                else:
+                    added, _ = self._merge_new_comments(post_id, fetched, update_existing=False)
+                    new_ids, score_changes = self.comment_diff.get(post_id, (set(), {}))
+                    self.comment_diff[post_id] = (new_ids | {comment.id for comment in added}, score_changes)
+                    self._insert_live_comments(post_id, added)
+                    # Busy threads are polled more often, quiet ones back off to save request budget
+                    if added: live['interval'] = max(LIVE_POLL_MIN, live['interval'] / 2)
+                    else: live['interval'] = min(LIVE_POLL_MAX, live['interval'] * 1.5)
+                    if added: self.set_status(f"{len(added)} new comments, next check in {live['interval']:.0f}s.", True)
+                live['due'] = time.time() + live['interval']
+            self._post_ui(apply)
+        self.background.submit(work)
+
+    def _insert_live_comments(self, post_id, comments):
+        """Inserts comments into the sorted thread and splices their lines into the layout.
+
+        Only the inserted comments are wrapped; existing lines are reused, and the
+        line at the top of the view stays there unless the view is at the very top.
+        """
+        ordered = self.comments.get(post_id)
+        post = self._selected_post()
+        if not ordered or self.current_view != VIEW_COMMENTS or post is None or post.id != post_id:
+            self._apply_comment_sort(post_id); return # Not on screen, nothing to keep in place
+        if not comments: return
+        with self.perf.span("live_insert"):
+            selected = ordered[self.current_comment_index] if self.current_comment_index < len(ordered) else None
+            inserted = set()
+            for comment in comments:
+                if insert_sorted_comment(ordered, comment, self.comment_sort, self._own_replies) is not None:
+                    inserted.add(id(comment))
+            if selected is not None:
+                self.current_comment_index = next(i for i, c in enumerate(ordered) if c is selected)
+
+            cache = getattr(self, '_comment_lines_cache', None)
+            if cache is None or cache['post_id'] != post_id: return # Laid out on the next draw
+            old_lines, lines = cache['lines'], []
+            anchor = old_lines[self.comment_scroll_top] if 0 < self.comment_scroll_top < len(old_lines) else None
+            parse = post_id not in self._markdown_pending
+            diff = self.comment_diff.get(post_id, (set(), {}))
+            old_index = 0
+            for c_idx, comment in enumerate(ordered):
+                if id(comment) in inserted:
+                    lines.extend(self._comment_entries(comment, c_idx, cache['wrap_width'], parse, diff))
+                    continue
+                while old_index < len(old_lines) and old_lines[old_index]['obj'] is comment:
+                    entry = old_lines[old_index]
+                    entry['c_idx'] = c_idx
+                    if entry is anchor: self.comment_scroll_top = len(lines)
+                    lines.append(entry)
+                    old_index += 1
+            cache['lines'] = lines
+            cache.pop('finder', None)
+
+    def jump_to_new_comment(self, post, step):
+        """Selects the next (step 1) or previous (step -1) comment that is new since the last visit."""
+        new_ids = self.comment_diff.get(post.id, (set(), {}))[0]
+        comments = self.comments.get(post.id) or []
+        stop = len(comments) if step > 0 else -1
+        for index in range(self.current_comment_index + step, stop, step):
+            if comments[index].id in new_ids:
+                self.current_comment_index = index
+                self._scroll_to_selection = True
+                return
+        self.set_status("No more new comments." if new_ids else "Nothing new since the last visit.", True)
+
+    def download_thread(self, post):
+        """Loads every comment of a thread in the background, showing the tree as it grows.
+
+        PRAW's own replace_more(limit=None) runs on a coordinator thread, so the merged
+        tree is exactly the serial one. Each MoreComments gets its request started on a
+        worker pool as soon as it is discovered, and replace_more picks up the finished
+        response instead of fetching it; morechildren already batches up to 100
+        comments per request. The requests, the first one included, run on download_pool,
+        whose workers keep their PRAW instances; the coordinator never touches the network.
+        """
+        post_id = post.id
+        if post_id in self._thread_downloads: self.set_status("Thread is already downloading.", True); return
+        if not self.reddit: self.set_status("Error: Not authenticated.", True); return
+        self._thread_downloads.add(post_id)
+        self.set_status(f"Downloading entire thread {post_id}...")
+
+        def publish(forest, requests_done, requests_total, finished=False, error=None):
+            kept = None
+            if forest is not None: # Walked here, only the coordinator thread touches the forest
+                kept, _ = self.content_filter.filter_comments(forest.list())
+            def apply():
+                if finished: self._thread_downloads.discard(post_id)
+                if kept is not None:
+                    # Replies still being sent, and posted ones the download may have missed, stay in the tree
+                    downloaded = {c.id for c in kept}
+                    carried = [c for c in self.comment_source.get(post_id) or ()
+                               if isinstance(c, PendingReply) or (c.id in self._own_replies and c.id not in downloaded)]
+                    self.comment_source[post_id] = kept + carried
+                    self.comment_diff.pop(post_id, None)
+                    self.last_fetch_time[post_id] = time.time()
+                    if finished: self._parse_markdown_in_background(post_id, kept)
+                    self._apply_comment_sort(post_id)
+                if error is not None:
+                    self.set_status(f"Thread download stopped: {error}", True)
+                elif finished:
+                    self.set_status(f"Loaded entire thread: {len(kept)} comments, {requests_total} requests.", True)
+                else:
+                    self.set_status(f"Downloading thread: {len(kept)} comments, {requests_done}/{requests_total} requests...")
+            self._post_ui(apply)
+
+        def work():
+            futures = [] # Cancelled if the download stops early
+            progress = {'done': 0, 'total': 0, 'published': time.time()}
+            progress_lock = threading.Lock() # Workers discover MoreComments too
+            forest = None
+
+            def fetch(data, comment_sort, comment_limit):
+                reddit = self._thread_reddit()
+                more = praw.models.MoreComments(reddit, data)
+                more.submission = reddit.submission(id=post_id)
+                more.submission.comment_sort, more.submission.comment_limit = comment_sort, comment_limit
+                with self.perf.span("morechildren", "net"):
+                    comments = list(more.comments(update=False))
+                prefetch(comments) # Nested MoreComments start before replace_more reaches them
+                return comments
+
+            def prefetch(comments):
+                todo = deque(comments)
+                while todo:
+                    comment = todo.popleft()
+                    if isinstance(comment, praw.models.MoreComments):
+                        data = {k: v for k, v in vars(comment).items() if not k.startswith('_') and k not in ('submission', 'comments')}
+                        future = self.download_pool.submit(fetch, data, submission.comment_sort, submission.comment_limit)
+                        with progress_lock:
+                            progress['total'] += 1
+                            futures.append(future)
+                        comment.comments = functools.partial(wait, future) # Shadows the method for replace_more
+                    else:
+                        todo.extend(comment.replies)
+
+            def wait(future, update=True):
+                if forest is not None and time.time() - progress['published'] >= THREAD_DOWNLOAD_PUBLISH:
+                    progress['published'] = time.time()
+                    publish(forest, progress['done'], progress['total'])
+                result = future.result()
+                with progress_lock: progress['done'] += 1
+                return result
+
+            try:
+                def load():
+                    submission = self._thread_reddit().submission(id=post_id)
+                    submission.comments # Fetched here, on a worker with a PRAW instance
+                    return submission
+
+                with self.perf.span("download_thread", "net"):
+                    submission = self.download_pool.submit(load).result()
+                    forest = submission.comments
+                    prefetch(forest)
+                    forest.replace_more(limit=None)
+                publish(forest, progress['done'], progress['total'], finished=True)
+            except Exception as e:
+                publish(forest, progress['done'], progress['total'], finished=True, error=e)
+            finally:
+                with progress_lock:
+                    for future in futures: future.cancel()
+        threading.Thread(target=work, name="thread-download", daemon=True).start()
+
+    @timed("fetch_comments", "net")
     def fetch_comments(self, post, replace_more_count=0):
         """Fetches comments, optionally replacing MoreComments objects."""
         if not self.reddit: self.set_status("Error: Not authenticated.", True); return
@@ -650,10 +2545,15 @@ class RedditCursesApp:
                  submission.comments.replace_more(limit=0)
 
             fetched_comments = submission.comments.list()
-            self.comments[post_id] = fetched_comments
+            with self.perf.span("filter_comments"):
+                fetched_comments, hidden = self.content_filter.filter_comments(fetched_comments)
+            if replace_more_count == 0: self.comment_diff.pop(post_id, None)
+            self.comment_source[post_id] = fetched_comments
+            self.comments[post_id] = sort_comments(fetched_comments, self.comment_sort, self._own_replies)
             self.last_fetch_time[post_id] = time.time()
+            self._parse_markdown_in_background(post_id, fetched_comments)
             if hasattr(self, '_comment_lines_cache'): del self._comment_lines_cache # Invalidate cache
-            self.set_status(f"Loaded {len(fetched_comments)} comment items.")
+            self.set_status(f"Loaded {len(fetched_comments)} comment items" + (f", {hidden} hidden by filters." if hidden else "."))
             # Reset scroll/selection only if it was the initial fetch
             if replace_more_count == 0:
                  self.current_comment_index = 0
@@ -667,6 +2567,128 @@ class RedditCursesApp:
              self.set_status(f"Unexpected error fetching comments: {e}", True)
 
 
+    # --- Write Actions (optimistic, submitted through self.actions) ---
+
+    def _post_ui(self, callback):
+        """Schedules `callback` to run on the UI thread; safe to call from any thread."""
+        self.ui_events.put(callback)
+        self._wakeup()
+
+    def _wakeup(self):
+        if self._wake_w is None: return
+        try:
+            os.write(self._wake_w, b'\0')
+        except (BlockingIOError, OSError):
+            pass # Pipe full means a wakeup is already pending
+
+    def _on_sigwinch(self, signum, frame):
+        self._resize_pending = True
+        self._wakeup()
+
+    def _drain_ui_events(self):
+        while True:
+            try:
+                callback = self.ui_events.get_nowait()
+            except queue.Empty:
+                return
+            callback()
+
+    def vote(self, thing, direction):
+        """Votes in `direction` (1/-1), or clears the vote if it is already cast that way."""
+        if isinstance(thing, (PendingReply, praw.models.MoreComments)):
+            self.set_status("Can't vote on that item.", True); return
+        old_likes, old_score = thing.likes, thing.score
+        old_direction = {True: 1, False: -1}.get(old_likes, 0)
+        new_direction = 0 if direction == old_direction else direction
+        thing.likes = {1: True, -1: False}.get(new_direction)
+        thing.score = old_score + new_direction - old_direction
+        if hasattr(self, '_comment_lines_cache'): del self._comment_lines_cache
+
+        def rollback():
+            thing.likes, thing.score = old_likes, old_score
+            if hasattr(self, '_comment_lines_cache'): del self._comment_lines_cache
+        self.actions.submit('vote', thing.fullname, rollback=rollback, direction=new_direction)
+
+    def toggle_save(self, thing):
+        if isinstance(thing, (PendingReply, praw.models.MoreComments)):
+            self.set_status("Can't save that item.", True); return
+        old_saved = getattr(thing, 'saved', False)
+        thing.saved = not old_saved
+        if hasattr(self, '_comment_lines_cache'): del self._comment_lines_cache
+        self.set_status("Saved." if thing.saved else "Unsaved.", True)
+
+        def rollback():
+            thing.saved = old_saved
+            if hasattr(self, '_comment_lines_cache'): del self._comment_lines_cache
+        self.actions.submit('save', thing.fullname, rollback=rollback, saved=thing.saved)
+
+    def reply(self, post, parent=None):
+        """Prompts for a reply to `parent` (a comment) or to the post itself."""
+        if isinstance(parent, (PendingReply, praw.models.MoreComments)):
+            self.set_status("Can't reply to that item.", True); return
+        text = self.prompt("Reply: " if parent else "Comment: ")
+        if not text or not text.strip():
+            self.set_status("Reply cancelled.", True); return
+
+        target = parent if parent is not None else post
+        pending = PendingReply(target.fullname, parent.depth + 1 if parent else 0, text, self.username)
+        source = self.comment_source.get(post.id)
+        if source is not None:
+            # Sorting puts pending replies first under their parent
+            source.append(pending)
+            self._apply_comment_sort(post.id)
+
+        def swap(replacement):
+            current = self.comment_source.get(post.id)
+            if current is not None and pending in current:
+                index = current.index(pending)
+                if replacement is None: del current[index]
+                else: current[index] = replacement
+                self._apply_comment_sort(post.id)
+
+        def on_success(comment):
+            comment.depth = pending.depth # Not part of the reply response
+            self._own_replies.add(comment.id)
+            swap(comment)
+            self.set_status("Reply posted.", True)
+        self.actions.submit('reply', target.fullname, on_success=on_success, rollback=lambda: swap(None), text=text)
+        self.set_status("Reply queued.", True)
+
+    def prompt(self, label, on_change=None):
+        """Reads a line of text in the status bar. Returns None if cancelled with Esc.
+
+        `on_change(text)` is called after every edit, e.g. to search as the user types.
+        """
+        text = ""
+        self.status_win.keypad(True)
+        try: curses.curs_set(1)
+        except curses.error: pass
+        try:
+            while True:
+                h, w = self.status_win.getmaxyx()
+                shown = f"{label}{text}"
+                while str_width(shown) > w - 1: shown = shown[1:] # Keep the end of long input visible
+                self.status_win.erase()
+                self.status_win.bkgd(' ', self.attr["status"])
+                safe_addstr(self.status_win, 0, 0, shown, self.attr["status"])
+                try: self.status_win.move(0, min(w - 1, str_width(shown)))
+                except curses.error: pass
+                self.status_win.refresh()
+
+                try:
+                    with self.perf.waiting(): ch = self.status_win.get_wch()
+                except curses.error:
+                    continue # Interrupted (e.g. by SIGWINCH)
+                if ch in ('\n', '\r') or ch == curses.KEY_ENTER: return text
+                if ch == '\x1b': return None
+                previous = text
+                if ch in (curses.KEY_BACKSPACE, '\x7f', '\b'): text = text[:-1]
+                elif isinstance(ch, str) and ch.isprintable(): text += ch
+                if on_change and text != previous: on_change(text)
+        finally:
+            try: curses.curs_set(0)
+            except curses.error: pass
+
     def open_link_in_browser(self, url):
          # ... (same as before) ...
          try:
@@ -678,43 +2700,46 @@ class RedditCursesApp:
     # --- Input Handling ---
     # ... (Refactor input handling methods, especially comments) ...
 
-    def _handle_list_input(self, key):
+    @timed("input")
+    def _handle_list_input(self, key, count=1):
         # ... (use self.target_subreddits, self.post_limit) ...
         sub_name = self.target_subreddits[self.current_sub_index]
-        current_posts = self.posts.get(sub_name, [])
+        current_posts = self._current_posts()
         lh, lw = self.left_win.getmaxyx()
         rh, rw = self.right_win.getmaxyx()
         num_subs = len(self.target_subreddits)
         num_posts = len(current_posts)
         lines_per_post_entry = 2
+        previous_index = self.current_post_index
 
         # --- Basic Movement ---
         if key == curses.KEY_DOWN or key == ord('j'):
             # ... (logic mostly same, just uses num_subs/num_posts) ...
             if self.active_pane == PANE_SUBS:
                 if self.current_sub_index < num_subs - 1:
-                    self.current_sub_index += 1
-                    if self.current_sub_index >= self.sub_scroll_top + lh - 2: self.sub_scroll_top += 1
+                    self.current_sub_index = min(num_subs - 1, self.current_sub_index + count)
+                    if self.current_sub_index >= self.sub_scroll_top + lh - 2:
+                        self.sub_scroll_top = self.current_sub_index - (lh - 2) + 1
             else:
                 if num_posts > 0 and self.current_post_index < num_posts - 1:
-                    self.current_post_index += 1
+                    self.current_post_index = min(num_posts - 1, self.current_post_index + count)
                     visible_posts_area_h = rh - 2
                     # Ensure post_scroll_top doesn't go beyond possible visible area
                     max_visible_posts = max(1, visible_posts_area_h // lines_per_post_entry)
                     if self.current_post_index >= self.post_scroll_top + max_visible_posts:
-                         self.post_scroll_top += 1
+                         self.post_scroll_top = self.current_post_index - max_visible_posts + 1
 
         elif key == curses.KEY_UP or key == ord('k'):
             # ... (logic mostly same) ...
             if self.active_pane == PANE_SUBS:
                 if self.current_sub_index > 0:
-                    self.current_sub_index -= 1
-                    if self.current_sub_index < self.sub_scroll_top: self.sub_scroll_top -= 1
+                    self.current_sub_index = max(0, self.current_sub_index - count)
+                    if self.current_sub_index < self.sub_scroll_top: self.sub_scroll_top = self.current_sub_index
             else:
                  if num_posts > 0 and self.current_post_index > 0:
-                    self.current_post_index -= 1
+                    self.current_post_index = max(0, self.current_post_index - count)
                     if self.current_post_index < self.post_scroll_top:
-                        self.post_scroll_top -= 1
+                        self.post_scroll_top = self.current_post_index
 
         # --- Page/Home/End ---
         elif key == curses.KEY_NPAGE: # Page Down
@@ -764,19 +2789,30 @@ class RedditCursesApp:
             self.set_status(f"Pane: {'Posts' if self.active_pane else 'Subreddits'}")
         elif key == ord('\n') or key == curses.KEY_ENTER:
             if self.active_pane == PANE_SUBS:
-                self.fetch_posts(sub_name)
+                listing_key = (sub_name, self.listing_mode)
+                if listing_key not in self.posts:
+                    self.fetch_posts(sub_name)
+                else:
+                    self.current_post_index = self.post_scroll_top = 0
+                    if self._listing_stale(listing_key): self.refresh_listing_in_background(listing_key)
                 self.active_pane = PANE_POSTS
             else:
                  if num_posts > 0:
+                    self.seen.add(current_posts[self.current_post_index].id)
                     self.current_view = VIEW_POST
                     self.post_content_scroll_top = 0
                     self.set_status(f"Viewing Post")
         elif key == ord('c'):
              if self.active_pane == PANE_POSTS and num_posts > 0:
                  post = current_posts[self.current_post_index]
+                 self.seen.add(post.id)
                  self.current_view = VIEW_COMMENTS
-                 self.fetch_comments(post) # Initial fetch (limit=0)
-                 self.set_status(f"Loading Comments")
+                 if self.comment_source.get(post.id):
+                     self.current_comment_index = self.comment_scroll_top = 0
+                     self.revisit_comments(post) # Loaded before, only fetch what's new
+                 else:
+                     self.fetch_comments(post) # Initial fetch (limit=0)
+                     self.set_status(f"Loading Comments")
              else:
                  self.set_status("Select post first (Tab -> Select)", True)
         elif key == ord('o'):
@@ -785,33 +2821,48 @@ class RedditCursesApp:
                  self.open_link_in_browser(post.url)
              else:
                  self.set_status("Select post first (Tab -> Select)", True)
+        elif key in (ord('u'), ord('d'), ord('s')):
+             if self.active_pane == PANE_POSTS and num_posts > 0:
+                 post = current_posts[self.current_post_index]
+                 if key == ord('s'): self.toggle_save(post)
+                 else: self.vote(post, 1 if key == ord('u') else -1)
+             else:
+                 self.set_status("Select post first (Tab -> Select)", True)
+        elif key == ord('m'):
+            kind = self.listing_mode.partition(':')[0]
+            next_kind = LISTING_MODES[(LISTING_MODES.index(kind) + 1) % len(LISTING_MODES)]
+            self.switch_listing(f"top:{TOP_TIME_FILTERS[1]}" if next_kind == "top" else next_kind)
+        elif key == ord('t'):
+            kind, _, time_filter = self.listing_mode.partition(':')
+            if kind != "top": self.switch_listing(f"top:{TOP_TIME_FILTERS[1]}")
+            else: self.switch_listing(f"top:{TOP_TIME_FILTERS[(TOP_TIME_FILTERS.index(time_filter) + 1) % len(TOP_TIME_FILTERS)]}")
         elif key == ord('r'):
             self.fetch_posts(sub_name)
             self.active_pane = PANE_POSTS
+        elif key == ord('H'):
+            self.toggle_hide_seen()
         elif key == ord('q'): return False # Quit
 
+        if self.active_pane == PANE_POSTS and current_posts is self._current_posts():
+            for post in current_posts[previous_index:self.current_post_index]: self.seen.add(post.id) # Scrolled past
         return True
 
-    def _handle_post_view_input(self, key):
+    @timed("input")
+    def _handle_post_view_input(self, key, count=1):
         # ... (mostly same as before) ...
         ph, pw = self.post_view_win.getmaxyx()
         content_h = ph - 5
         sub_name = self.target_subreddits[self.current_sub_index]
-        post = self.posts.get(sub_name, [])[self.current_post_index]
-        content_to_display = post.selftext if post.is_self else f"Link: {post.url}"
-        lines = []
-        if content_to_display:
-            for paragraph in content_to_display.split('\n'):
-                 lines.extend(textwrap.wrap(paragraph, width=pw - 4, replace_whitespace=False, drop_whitespace=False))
-        num_lines = len(lines)
+        post = self._current_posts()[self.current_post_index]
+        num_lines = len(self._get_post_lines(post, pw - 4))
 
         if key == ord('q') or key == 27:
             self.current_view = VIEW_LIST
             self.set_status(f"r/{sub_name}")
         elif key == curses.KEY_DOWN or key == ord('j'):
-            if self.post_content_scroll_top < max(0, num_lines - content_h): self.post_content_scroll_top += 1
+            self.post_content_scroll_top = max(self.post_content_scroll_top, min(max(0, num_lines - content_h), self.post_content_scroll_top + count))
         elif key == curses.KEY_UP or key == ord('k'):
-            if self.post_content_scroll_top > 0: self.post_content_scroll_top -= 1
+            self.post_content_scroll_top = max(0, self.post_content_scroll_top - count)
         elif key == curses.KEY_NPAGE:
             scroll_amount = max(1, content_h - 1)
             self.post_content_scroll_top = min(max(0, num_lines - content_h), self.post_content_scroll_top + scroll_amount)
@@ -823,14 +2874,25 @@ class RedditCursesApp:
         elif key == curses.KEY_END:
              self.post_content_scroll_top = max(0, num_lines - content_h)
         elif key == ord('o'):
-             self.open_link_in_browser(f"https://reddit.com{post.permalink}" if post.is_self else post.url)
+             if post.is_self:
+                 links = [("Thread", f"https://reddit.com{post.permalink}")] + self._markdown(f"t3_{post.id}", post.selftext).links
+             else:
+                 links = [("Link", post.url)]
+             self.open_links(links)
+        elif key == ord('u'): self.vote(post, 1)
+        elif key == ord('d'): self.vote(post, -1)
+        elif key == ord('s'): self.toggle_save(post)
+        elif key == ord('R'): self.reply(post)
+        elif key == ord('/'): self.find_in_view()
+        elif key in (ord('n'), ord('N')): self.find_next(1 if key == ord('n') else -1)
 
         return True
 
-    def _handle_comments_view_input(self, key):
+    @timed("input")
+    def _handle_comments_view_input(self, key, count=1):
         # --- Navigation based on comment *objects* first ---
         sub_name = self.target_subreddits[self.current_sub_index]
-        post = self.posts.get(sub_name, [])[self.current_post_index]
+        post = self._current_posts()[self.current_post_index]
         current_comments = self.comments.get(post.id, []) # The list of comment objects
         num_comments = len(current_comments)
 
@@ -849,7 +2911,7 @@ class RedditCursesApp:
 
         if key == curses.KEY_DOWN or key == ord('j'):
             if self.current_comment_index < num_comments - 1:
-                 self.current_comment_index += 1
+                 self.current_comment_index = min(num_comments - 1, self.current_comment_index + count)
                  # Auto-scroll down to keep the newly selected comment visible
                  if selected_comment_start_line != -1:
                      # Find the start line of the *new* selected comment
@@ -865,7 +2927,7 @@ class RedditCursesApp:
 
         elif key == curses.KEY_UP or key == ord('k'):
              if self.current_comment_index > 0:
-                 self.current_comment_index -= 1
+                 self.current_comment_index = max(0, self.current_comment_index - count)
                  # Auto-scroll up
                  if selected_comment_start_line != -1:
                       # Find the start line of the *new* selected comment
@@ -898,8 +2960,12 @@ class RedditCursesApp:
                  if current_comments: self.current_comment_index = len(current_comments) - 1
 
         # --- Actions ---
+        elif key == ord('L'):
+            self.download_thread(post)
         elif key == ord('l'): # Load More Comments
-            if current_comments and self.current_comment_index < num_comments:
+            if post.id in self._thread_downloads:
+                self.set_status("Thread is downloading, every comment will be loaded.", True)
+            elif current_comments and self.current_comment_index < num_comments:
                 selected_comment = current_comments[self.current_comment_index]
                 if isinstance(selected_comment, praw.models.MoreComments):
                      # Fetch again, but request replacements
@@ -910,8 +2976,36 @@ class RedditCursesApp:
             else:
                 self.set_status("No comment selected?", True)
 
+        elif key in (ord('u'), ord('d'), ord('s'), ord('R')):
+            if current_comments and self.current_comment_index < num_comments:
+                selected_comment = current_comments[self.current_comment_index]
+                if key == ord('u'): self.vote(selected_comment, 1)
+                elif key == ord('d'): self.vote(selected_comment, -1)
+                elif key == ord('s'): self.toggle_save(selected_comment)
+                else: self.reply(post, selected_comment)
+            else:
+                self.set_status("No comment selected?", True)
+        elif key == ord('C'):
+             self.reply(post)
+        elif key == ord('S'):
+             self.cycle_comment_sort(post)
+        elif key in (ord(']'), ord('[')):
+             self.jump_to_new_comment(post, 1 if key == ord(']') else -1)
+        elif key == ord('F'):
+             self.toggle_live(post)
+        elif key == ord('/'):
+             self.find_in_view()
+        elif key in (ord('n'), ord('N')):
+             self.find_next(1 if key == ord('n') else -1)
+        elif key == ord('r'):
+             self.fetch_comments(post) # Full reload
         elif key == ord('o'):
-             self.open_link_in_browser(f"https://reddit.com{post.permalink}") # Always open post permalink
+             links = [("Thread", f"https://reddit.com{post.permalink}")]
+             if current_comments and self.current_comment_index < num_comments:
+                 selected_comment = current_comments[self.current_comment_index]
+                 if not isinstance(selected_comment, (praw.models.MoreComments, PendingReply)):
+                     links += self._markdown(f"t1_{selected_comment.id}", selected_comment.body).links
+             self.open_links(links) # Just the permalink unless the comment has links
         elif key == ord('q') or key == 27:
             self.current_view = VIEW_LIST
             self.set_status(f"r/{sub_name}")
@@ -934,6 +3028,14 @@ class RedditCursesApp:
              print("If using config.ini, ensure it exists and is correctly formatted.")
              return # Exit if auth failed
 
+        if self.network is not None and self.network.offline:
+            # A replay must neither flush (and on LookupError, drop) the real outbox nor mark posts seen
+            self.actions.path = self.seen.path = None
+        elif self.network is not None:
+            self.set_status("Recording: votes, saves and replies are sent to reddit.com as usual.", True, 5)
+        self.actions.start()
+        self.seen.open()
+        if self.seen.error: self.set_status(self.seen.error, True, 5)
         try:
             curses.wrapper(self._run_curses)
         except curses.error as e:
@@ -945,6 +3047,9 @@ class RedditCursesApp:
             print(f"\nAn unexpected error occurred: {e}")
             import traceback
             traceback.print_exc()
+        finally:
+            self.seen.close()
+            self.perf.write_trace()
 
 
     def _run_curses(self, stdscr):
@@ -957,21 +3062,22 @@ class RedditCursesApp:
         running = True
         while running:
             try:
-                self.draw_ui()
-                key = self.stdscr.getch() # Get input
-
-                # Handle global keys first
-                if key == curses.KEY_RESIZE:
+                if self._resize_pending:
+                    self._resize_pending = False
+                    size = os.get_terminal_size(sys.__stdout__.fileno())
+                    curses.resizeterm(size.lines, size.columns)
                     self.handle_resize()
-                    continue
+                self._drain_ui_events()
+                self._run_timers()
+                self.draw_ui()
+                self.perf.frame_painted()
 
-                # Handle view-specific keys
-                if self.current_view == VIEW_LIST:
-                    running = self._handle_list_input(key)
-                elif self.current_view == VIEW_POST:
-                    running = self._handle_post_view_input(key)
-                elif self.current_view == VIEW_COMMENTS:
-                    running = self._handle_comments_view_input(key)
+                # Sleep until a key, a background result or the next timer, then
+                # handle everything that is pending before painting once.
+                for key, count in coalesce_keys(self._read_keys(self._next_timeout())):
+                    self.perf.key_pressed()
+                    running = self._handle_key(key, count)
+                    if not running: break
 
             except curses.error as e:
                  # Handle potential curses errors gracefully during loop
@@ -984,6 +3090,79 @@ class RedditCursesApp:
                  traceback.print_exc()
                  running = False # Exit loop
 
+    def _handle_key(self, key, count=1):
+        # Handle global keys first
+        if key == curses.KEY_RESIZE:
+            self.handle_resize()
+            return True
+        if key == ord('P'):
+            self.show_perf_overlay = not self.show_perf_overlay
+            return True
+
+        if self.link_picker:
+            self._handle_link_picker_input(key, count)
+            return True
+
+        # Handle view-specific keys
+        if self.current_view == VIEW_LIST:
+            return self._handle_list_input(key, count)
+        elif self.current_view == VIEW_POST:
+            return self._handle_post_view_input(key, count)
+        elif self.current_view == VIEW_COMMENTS:
+            return self._handle_comments_view_input(key, count)
+        return True
+
+    def _timer_deadlines(self):
+        """Times (time.time()) at which the screen must be repainted without input."""
+        deadlines = []
+        if self.temp_status_message and self.temp_status_timer > time.time():
+            deadlines.append(self.temp_status_timer)
+        if self.show_perf_overlay:
+            deadlines.append(time.time() + PERF_OVERLAY_REFRESH)
+        if self.live_thread and not self.live_thread['polling']:
+            deadlines.append(self.live_thread['due'])
+        previous = self._previous_listing
+        if previous in self.last_fetch_time and previous not in self._listing_refreshing:
+            stale_at = self.last_fetch_time[previous] + LISTING_TTL[previous[1].partition(':')[0]]
+            deadlines.append(max(stale_at, self._listing_retry.get(previous, (0, 0))[0]))
+        return deadlines
+
+    def _next_timeout(self):
+        deadlines = self._timer_deadlines()
+        if not deadlines: return None # Nothing scheduled, block until input
+        return max(0, min(deadlines) - time.time())
+
+    def _read_keys(self, timeout):
+        """Blocks until input, a wakeup or `timeout`, then returns the pending keys.
+
+        Reading stops after a key that may open a prompt, so the keys typed after
+        it stay in the terminal's input for the prompt to read.
+        """
+        if self._wake_r is not None:
+            try:
+                readable, _, _ = select.select([sys.stdin, self._wake_r], [], [], timeout)
+            except InterruptedError:
+                readable = []
+            if self._wake_r in readable:
+                try:
+                    while os.read(self._wake_r, 4096): pass
+                except BlockingIOError:
+                    pass
+            keys = []
+        else:
+            key = self.stdscr.getch() # Polling fallback, waits up to timeout(100)
+            keys = [key] if key != -1 else []
+            if not keys or key in PROMPT_KEYS: return keys
+
+        self.stdscr.nodelay(1)
+        while True:
+            key = self.stdscr.getch()
+            if key == -1: break
+            keys.append(key)
+            if key in PROMPT_KEYS: break
+        if self._wake_r is None: self.stdscr.timeout(100)
+        return keys
+
     def _create_default_config(self):
         """Creates a default config.ini if one doesn't exist."""
         if os.path.exists(CONFIG_FILE): return
@@ -1002,8 +3181,12 @@ class RedditCursesApp:
         config['Settings'] = {
             'Subreddits': ', '.join(DEFAULT_TARGET_SUBREDDITS),
             'PostLimit': str(DEFAULT_POST_LIMIT),
-            'CommentLimit': str(DEFAULT_COMMENT_LIMIT)
+            'CommentLimit': str(DEFAULT_COMMENT_LIMIT),
+            'ListingMode': DEFAULT_LISTING_MODE,
+            'HideSeen': 'no'
         }
+        # Comma or newline separated and case-insensitive; Patterns takes one (case-sensitive) regex per line
+        config['Filters'] = {'Keywords': '', 'Patterns': '', 'Authors': '', 'Domains': '', 'Flairs': ''}
         try:
             with open(CONFIG_FILE, 'w') as configfile:
                 config.write(configfile)
@@ -1014,11 +3197,194 @@ class RedditCursesApp:
             print(f"ERROR: Could not write default config file: {e}")
             # Don't exit, will proceed with prompts or defaults
 
+# --- Listings ---
+def is_valid_listing(listing):
+    kind, _, time_filter = listing.partition(':')
+    return kind in LISTING_MODES and (time_filter in TOP_TIME_FILTERS if kind == "top" else not time_filter)
+
+def listing_generator(reddit, sub_name, listing, limit):
+    """Lazy PRAW listing for a mode key such as "hot" or "top:week"."""
+    subreddit = reddit.subreddit(sub_name)
+    kind, _, time_filter = listing.partition(':')
+    if kind == "top":
+        return subreddit.top(time_filter=time_filter, limit=limit)
+    return getattr(subreddit, kind)(limit=limit)
+
+# --- Headless Dump Mode ---
+def serialize_post(post):
+    return {
+        "type": "post",
+        "id": post.id,
+        "subreddit": post.subreddit.display_name,
+        "title": post.title,
+        "author": post.author.name if post.author else None,
+        "score": post.score,
+        "num_comments": post.num_comments,
+        "created_utc": post.created_utc,
+        "url": post.url,
+        "permalink": post.permalink,
+        "is_self": post.is_self,
+        "selftext": post.selftext,
+        "stickied": post.stickied,
+    }
+
+def serialize_comment(comment, post_id):
+    return {
+        "type": "comment",
+        "id": comment.id,
+        "post_id": post_id,
+        "parent_id": comment.parent_id,
+        "depth": comment.depth,
+        "author": comment.author.name if comment.author else None,
+        "score": comment.score,
+        "created_utc": comment.created_utc,
+        "body": comment.body,
+    }
+
+def iter_comment_tree(forest):
+    """Yields comments depth-first in thread order, skipping unresolved MoreComments."""
+    stack = list(reversed(forest))
+    while stack:
+        comment = stack.pop()
+        if isinstance(comment, praw.models.MoreComments): continue
+        yield comment
+        stack.extend(reversed(comment.replies))
+
+def iter_subreddit_records(reddit, sub_name, limit, with_comments, more_limit, listing=DEFAULT_LISTING_MODE):
+    """Streams one subreddit as records; only the current submission's tree is held in memory."""
+    for post in listing_generator(reddit, sub_name, listing, limit):
+        yield serialize_post(post)
+        if with_comments:
+            post.comments.replace_more(limit=more_limit)
+            for comment in iter_comment_tree(post.comments):
+                yield serialize_comment(comment, post.id)
+
+def stream_subreddits(app, subs, limit, with_comments, more_limit, workers, listing=DEFAULT_LISTING_MODE):
+    """Fetches subreddits on `workers` threads, yielding records as they arrive.
+
+    The result queue is bounded, so fetch workers block instead of buffering
+    when the consumer falls behind.
+    """
+    pending = queue.Queue()
+    for sub_name in subs: pending.put(sub_name)
+    results = queue.Queue(maxsize=DUMP_QUEUE_SIZE)
+    stop = threading.Event()
+    finished = object()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                results.put(item, timeout=0.5); return
+            except queue.Full:
+                continue
+
+    def worker():
+        reddit = app._thread_reddit()
+        while not stop.is_set():
+            try:
+                sub_name = pending.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                with app.perf.span(f"dump r/{sub_name}", "net"):
+                    for record in iter_subreddit_records(reddit, sub_name, limit, with_comments, more_limit, listing):
+                        if stop.is_set(): break
+                        put(record)
+            except Exception as e:
+                put({"type": "error", "subreddit": sub_name, "error": str(e)})
+        put(finished)
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(max(1, min(workers, len(subs))))]
+    for t in threads: t.start()
+    try:
+        remaining = len(threads)
+        while remaining:
+            item = results.get()
+            if item is finished:
+                remaining -= 1
+            else:
+                yield item
+    finally:
+        stop.set()
+
+def run_dump(app, args):
+    """Non-interactive mode: writes posts (and comments) as JSON Lines to stdout."""
+    # Keep stdout clean for the records, informational output goes to stderr
+    with redirect_stdout(sys.stderr):
+        if not os.path.exists(CONFIG_FILE):
+            app._create_default_config()
+        if not app.authenticate():
+            return 1
+
+    subs = [sub.strip() for sub in args.subs.split(',') if sub.strip()] if args.subs else app.target_subreddits
+    limit = args.limit if args.limit is not None else app.post_limit
+    errors = 0
+    try:
+        for record in stream_subreddits(app, subs, limit, args.comments, args.more, args.workers, args.listing):
+            if record["type"] == "error":
+                errors += 1
+                print(f"ERROR: r/{record['subreddit']}: {record['error']}", file=sys.stderr)
+                continue
+            sys.stdout.write(json.dumps(record) + '\n')
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # Consumer went away (e.g. piped into head), not an error. Point stdout at
+        # devnull so the interpreter's final flush doesn't raise again.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    finally:
+        app.perf.write_trace()
+    return 1 if errors else 0
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="redCli - a Reddit client for the command line")
+    parser.add_argument('--trace', metavar='FILE',
+                        help="write hot-path timings to FILE as Chrome trace-event JSON on exit")
+    network = parser.add_mutually_exclusive_group()
+    network.add_argument('--record', metavar='FILE', help="record every HTTP exchange of the session to FILE (gzipped JSON Lines)")
+    network.add_argument('--replay', metavar='FILE', help="serve HTTP responses from a --record FILE instead of reddit.com")
+    parser.add_argument('--replay-latency', type=float, default=1.0, metavar='SCALE',
+                        help="multiply recorded response times by SCALE when replaying, 0 for none (default: 1)")
+    commands = parser.add_subparsers(dest='command')
+    dump = commands.add_parser('dump', help="stream posts and comments as JSON Lines to stdout")
+    dump.add_argument('--subs', help="comma separated subreddits (default: Subreddits from config)")
+    dump.add_argument('--comments', action='store_true', help="include each post's comment tree")
+    dump.add_argument('--limit', type=int, help="posts per subreddit (default: PostLimit from config)")
+    dump.add_argument('--more', type=int, default=0, metavar='N',
+                      help="'load more' expansions per post, 0 for none, -1 for all (default: 0)")
+    dump.add_argument('--listing', default=DEFAULT_LISTING_MODE,
+                      help=f"listing mode: {', '.join(LISTING_MODES)} or top:<{'|'.join(TOP_TIME_FILTERS)}> (default: {DEFAULT_LISTING_MODE})")
+    dump.add_argument('--workers', type=int, default=DEFAULT_DUMP_WORKERS,
+                      help=f"subreddits fetched concurrently (default: {DEFAULT_DUMP_WORKERS})")
+    commands.add_parser('bench-width', help="benchmark display-width helpers against len() on ASCII text")
+    commands.add_parser('bench-filter', help="benchmark [Filters] pattern matching against one scan per pattern")
+    args = parser.parse_args(argv)
+    if args.command == 'dump':
+        if args.more < 0: args.more = None # replace_more(limit=None) expands all
+        if not is_valid_listing(args.listing): parser.error(f"invalid listing mode: {args.listing}")
+    return args
+
 # --- Run the app ---
 if __name__ == "__main__":
+    args = parse_args()
+    if args.command == 'bench-width':
+        for name, baseline, candidate in benchmark_display_width():
+            print(f"{name:<10} len(): {baseline * 1e3:8.2f}ms  width: {candidate * 1e3:8.2f}ms  x{candidate / baseline:.2f}")
+        sys.exit(0)
+    if args.command == 'bench-filter':
+        for name, baseline, candidate, scans in benchmark_content_filter():
+            print(f"{name:<10} per pattern: {baseline * 1e3:8.1f}ms  combined: {candidate * 1e3:8.1f}ms ({scans} scans)  x{candidate / baseline:.2f}")
+        sys.exit(0)
     if os.name == 'nt':
         try: import windows_curses
         except ImportError: print("Please install 'windows-curses'"); sys.exit(1)
 
-    app = RedditCursesApp(None)
-    app.run()
+    app = RedditCursesApp(None, trace_file=args.trace)
+    if args.record: app.network = SessionRecorder(args.record)
+    elif args.replay: app.network = SessionReplay(args.replay, args.replay_latency)
+    try:
+        if args.command == 'dump':
+            sys.exit(run_dump(app, args))
+        app.run()
+    finally:
+        if app.network: app.network.close()